@@ -1,10 +1,14 @@
 # app/api/deps.py
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
+from app.core.cache import MISSING
+from app.core.config import settings
+from app.core.database import SessionLocal, ReadSessionLocal, AsyncSessionLocal
 from app.models.user import User
-from app.services.auth import verify_token
+from app.schemas.user import UserRead
+from app.services.auth import verify_token, token_cache
 
 # Dependency pour obtenir la session DB
 def get_db():
@@ -14,14 +18,35 @@ def get_db():
     finally:
         db.close()
 
+# Dependency pour les endpoints en lecture seule (réplique si DATABASE_READ_URL est défini)
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Dependency pour obtenir une session DB asynchrone (endpoints appelés par les devices)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # Security scheme
 security = HTTPBearer()
 
-def get_current_user(
+def get_current_principal(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
-    """Récupère l'utilisateur connecté à partir du token JWT"""
+) -> UserRead:
+    """
+    Récupère l'utilisateur connecté à partir du token JWT.
+    Un token déjà vérifié est servi depuis le cache, sans décodage ni requête en base.
+    """
+    token = credentials.credentials
+    principal = token_cache.get(token)
+    if principal is not MISSING:
+        return principal
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -29,20 +54,40 @@ def get_current_user(
     )
     
     try:
-        payload = verify_token(credentials.credentials)
+        payload = verify_token(token)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
     except Exception:
         raise credentials_exception
     
+    generation = token_cache.generation
     user = db.query(User).filter(User.email == email).first()
     if user is None:
         raise credentials_exception
     
+    # Le cache ne doit pas prolonger la validité du token
+    principal = UserRead.model_validate(user)
+    ttl = min(payload.get("exp", 0) - time.time(), settings.token_cache_ttl_seconds)
+    if ttl > 0:
+        token_cache.set(token, principal, ttl=ttl, generation=generation)
+    return principal
+
+def get_current_user(
+    principal: UserRead = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+) -> User:
+    """Récupère l'utilisateur connecté (objet ORM, pour les endpoints qui le modifient)"""
+    user = db.get(User, principal.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
-def require_superadmin(current_user: User = Depends(get_current_user)) -> User:
+def require_superadmin(current_user: UserRead = Depends(get_current_principal)) -> UserRead:
     """Vérifie que l'utilisateur connecté est un superadmin"""
     if current_user.role != "superadmin":
         raise HTTPException(
@@ -51,7 +96,7 @@ def require_superadmin(current_user: User = Depends(get_current_user)) -> User:
         )
     return current_user
 
-def require_admin_or_superadmin(current_user: User = Depends(get_current_user)) -> User:
+def require_admin_or_superadmin(current_user: UserRead = Depends(get_current_principal)) -> UserRead:
     """Vérifie que l'utilisateur connecté est au moins admin"""
     if current_user.role not in ["admin", "superadmin"]:
         raise HTTPException(
@@ -1,13 +1,19 @@
 # app/api/endpoints/auth.py
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.schemas.user import UserRead
-from app.services.auth import verify_password, create_access_token, get_password_hash
-from app.api.deps import get_db, get_current_user
+from app.services.auth import (
+    verify_password_async, create_access_token, get_password_hash_async, invalidate_user_tokens
+)
+from app.services.user import get_user_by_email_async
+from app.api.deps import get_db, get_async_db, get_current_principal
 from pydantic import BaseModel
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class LoginRequest(BaseModel):
     email: str
@@ -18,31 +24,37 @@ class ChangePasswordRequest(BaseModel):
     new_password: str
 
 @router.post("/login")
-def login(data: LoginRequest, db: Session = Depends(get_db)):
+async def login(data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Authentification de l'utilisateur"""
-    print(f"🔐 Tentative de connexion pour: {data.email}")  # Debug
+    logger.debug("🔐 Tentative de connexion", extra={"email": data.email})
     
     # Rechercher l'utilisateur par email
-    user = db.query(User).filter(User.email == data.email).first()
+    user = await get_user_by_email_async(db, data.email)
     
     if not user:
-        print(f"❌ Utilisateur non trouvé: {data.email}")  # Debug
+        logger.info("❌ Connexion refusée : utilisateur non trouvé", extra={"email": data.email})
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail="Identifiants incorrects"
         )
     
-    print(f"✅ Utilisateur trouvé: {user.email}, rôle: {user.role}")  # Debug
+    logger.debug("✅ Utilisateur trouvé", extra={"email": user.email, "role": user.role})
     
-    # Vérifier le mot de passe
-    if not verify_password(data.password, user.hashed_password):
-        print(f"❌ Mot de passe incorrect pour: {data.email}")  # Debug
+    # Vérifier le mot de passe (pool dédié au hash)
+    valid, new_hash = await verify_password_async(data.password, user.hashed_password)
+    if not valid:
+        logger.info("❌ Connexion refusée : mot de passe incorrect", extra={"email": data.email})
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail="Identifiants incorrects"
         )
     
-    print(f"✅ Mot de passe correct pour: {data.email}")  # Debug
+    logger.debug("✅ Mot de passe correct", extra={"email": data.email})
+    
+    # Le coût bcrypt configuré a changé : le hash est mis à jour de façon transparente
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     
     # Créer le token JWT avec toutes les informations nécessaires
     token_data = {
@@ -51,11 +63,11 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
         "site_id": user.site_id  # ID du site (peut être None pour les superadmins)
     }
     
-    print(f"🎫 Création du token avec les données: {token_data}")  # Debug
+    logger.debug("🎫 Création du token", extra={"token_data": token_data})
     
     try:
         token = create_access_token(token_data)
-        print(f"✅ Token créé avec succès")  # Debug
+        logger.info("✅ Connexion réussie", extra={"email": user.email, "role": user.role})
         
         return {
             "access_token": token, 
@@ -66,24 +78,29 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
                 "site_id": user.site_id
             }
         }
-    except Exception as e:
-        print(f"❌ Erreur lors de la création du token: {e}")  # Debug
+    except Exception:
+        logger.exception("❌ Erreur lors de la création du token")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur lors de la création du token"
         )
 
 @router.post("/change-password")
-def change_password(
+async def change_password(
     data: ChangePasswordRequest, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    principal: UserRead = Depends(get_current_principal)
 ):
     """Permet à un utilisateur de changer son mot de passe"""
-    print(f"🔑 Changement de mot de passe pour: {current_user.email}")  # Debug
+    current_user = await db.get(User, principal.id)
+    if current_user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    
+    logger.debug("🔑 Changement de mot de passe", extra={"email": current_user.email})
     
-    if not verify_password(data.current_password, current_user.hashed_password):
-        print(f"❌ Mot de passe actuel incorrect pour: {current_user.email}")  # Debug
+    valid, _ = await verify_password_async(data.current_password, current_user.hashed_password)
+    if not valid:
+        logger.info("❌ Changement de mot de passe refusé : mot de passe actuel incorrect", extra={"email": current_user.email})
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail="Mot de passe actuel incorrect"
@@ -96,15 +113,16 @@ def change_password(
             detail="Le nouveau mot de passe doit contenir au moins 8 caractères"
         )
     
-    current_user.hashed_password = get_password_hash(data.new_password)
-    db.commit()
+    current_user.hashed_password = await get_password_hash_async(data.new_password)
+    await db.commit()
+    invalidate_user_tokens(current_user.id)
     
-    print(f"✅ Mot de passe changé avec succès pour: {current_user.email}")  # Debug
+    logger.info("✅ Mot de passe changé", extra={"email": current_user.email})
     
     return {"message": "Mot de passe modifié avec succès"}
 
 @router.get("/me", response_model=UserRead)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(current_user: UserRead = Depends(get_current_principal)):
     """Retourne les informations de l'utilisateur connecté"""
     return current_user
 
@@ -1,15 +1,17 @@
 # app/api/endpoints/device.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from app.core.pagination import PageRequest
+from app.core.responses import FastJSONResponse, dump_trusted_list
 from app.schemas.device import DeviceCreate, DeviceRead, DeviceUpdate, DeviceAction
-from app.api.deps import get_db, require_admin_or_superadmin, get_current_user
+from app.api.deps import get_db, get_read_db, require_admin_or_superadmin, get_current_principal
 from app.services.device import (
     create_device, get_device_by_name, get_device_by_id,
-    get_devices_by_site, get_all_devices, update_device,
-    set_device_action, get_device_statistics
+    list_devices_page, update_device,
+    set_device_action, get_device_statistics, delete_device
 )
-from app.models.user import User
+from app.schemas.user import UserRead
 
 router = APIRouter()
 
@@ -27,34 +29,52 @@ def register_device(
 @router.get("/", response_model=List[DeviceRead])
 def list_devices(
     site_id: int = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    online: Optional[bool] = None,
+    playing: Optional[bool] = None,
+    name_prefix: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: UserRead = Depends(get_current_principal)
 ):
-    """Liste tous les devices ou ceux d'un site spécifique"""
+    """
+    Liste les devices, filtrés par site, état ou préfixe de nom.
+    Avec cursor/limit, la réponse est paginée (curseur suivant dans X-Next-Cursor) ;
+    fields=a,b,c ne renvoie que les colonnes demandées.
+    """
     if current_user.role == "admin" and current_user.site_id:
         # Admin de site ne voit que ses devices
-        return get_devices_by_site(db, current_user.site_id)
-    elif site_id:
-        return get_devices_by_site(db, site_id)
-    else:
-        return get_all_devices(db)
+        site_id = current_user.site_id
+    
+    try:
+        page = PageRequest(cursor, limit, fields, DeviceRead.model_fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    devices = list_devices_page(db, page, site_id, online, playing, name_prefix)
+    if page.legacy:
+        # Lignes lues en base, déjà conformes à DeviceRead : pas de revalidation
+        return FastJSONResponse(dump_trusted_list(devices, DeviceRead))
+    return page.response(devices, DeviceRead)
 
 @router.get("/statistics")
 def get_statistics(
     site_id: int = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    by_site: bool = False,
+    db: Session = Depends(get_read_db),
+    current_user: UserRead = Depends(get_current_principal)
 ):
-    """Retourne des statistiques sur les devices"""
+    """Retourne des statistiques sur les devices (détail par site avec by_site=true)"""
     if current_user.role == "admin" and current_user.site_id:
         site_id = current_user.site_id
-    return get_device_statistics(db, site_id)
+    return get_device_statistics(db, site_id, by_site)
 
 @router.get("/{device_id}", response_model=DeviceRead)
 def get_device(
     device_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserRead = Depends(get_current_principal)
 ):
     device = get_device_by_id(db, device_id)
     if not device:
@@ -93,15 +113,13 @@ def send_device_action(
     return {"status": "Action enregistrée", "device": device.name, "action": action.action}
 
 @router.delete("/{device_id}")
-def delete_device(
+def delete_device_endpoint(
     device_id: int,
     db: Session = Depends(get_db),
     current_user=Depends(require_admin_or_superadmin)
 ):
-    device = get_device_by_id(db, device_id)
-    if not device:
+    success = delete_device(db, device_id)
+    if not success:
         raise HTTPException(status_code=404, detail="Device non trouvé")
     
-    db.delete(device)
-    db.commit()
     return {"status": "Device supprimé"}
\ No newline at end of file
@@ -0,0 +1,119 @@
+# app/api/endpoints/device_push.py
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional, Tuple, Dict, Any
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.http_cache import etag_matches
+from app.core.notifier import notifier, Subscription
+from app.core.responses import FastJSONResponse
+from app.services.device import get_device_snapshot_by_name
+from app.services.sync import compute_sync_etag, build_sync_payload
+
+router = APIRouter()
+
+def load_sync_state(
+    site: str, location: str, known_etag: Optional[str] = None
+) -> Optional[Tuple[str, Optional[Dict[str, Any]]]]:
+    """
+    Charge la version courante de la configuration d'un device.
+    Retourne None si le device n'existe pas, et un payload None si la version
+    correspond à known_etag (la playlist n'est alors pas relue).
+    """
+    db = SessionLocal()
+    try:
+        device = get_device_snapshot_by_name(db, f"{site}-{location}")
+        if not device:
+            return None
+
+        etag = compute_sync_etag(device, site, location)
+        if etag_matches(known_etag, etag):
+            return etag, None
+        return etag, build_sync_payload(device, site, location)
+    finally:
+        db.close()
+
+@router.get("/sync/wait")
+async def wait_for_sync(
+    request: Request,
+    site: str = Query(...),
+    location: str = Query(...),
+    timeout: Optional[int] = Query(None, ge=1)
+):
+    """
+    Long-poll : répond dès que la configuration diffère de l'ETag envoyé dans If-None-Match,
+    ou 304 à l'expiration du délai. Même format de réponse que /devices/sync.
+    """
+    loop = asyncio.get_running_loop()
+    wait_seconds = min(timeout or settings.push_max_wait_seconds, settings.push_max_wait_seconds)
+    deadline = loop.time() + wait_seconds
+    known_etag = request.headers.get("if-none-match")
+
+    # Abonnement avant la lecture pour ne pas manquer un commit intermédiaire
+    sub = notifier.subscribe(site, location)
+    try:
+        while True:
+            sub.clear()
+            state = await run_in_threadpool(load_sync_state, site, location, known_etag)
+            if state is None:
+                raise HTTPException(status_code=404, detail="Device non enregistré.")
+
+            etag, payload = state
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+            if payload is not None:
+                return FastJSONResponse(payload, headers=headers)
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return Response(status_code=304, headers=headers)
+            await sub.wait(min(remaining, settings.push_recheck_seconds))
+    finally:
+        notifier.unsubscribe(sub)
+
+async def _watch_disconnect(websocket: WebSocket, sub: Subscription):
+    """Consomme les messages entrants et ferme l'abonnement à la déconnexion"""
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    finally:
+        sub.close()
+
+@router.websocket("/ws")
+async def device_push(
+    websocket: WebSocket,
+    site: str = Query(...),
+    location: str = Query(...)
+):
+    """
+    Canal push : envoie {"etag", "config"} à la connexion puis à chaque changement
+    de configuration, d'actions en attente ou de playlist.
+    En cas de coupure, le device revient simplement au polling de /devices/sync.
+    """
+    await websocket.accept()
+
+    sub = notifier.subscribe(site, location)
+    watcher = asyncio.create_task(_watch_disconnect(websocket, sub))
+    last_etag = None
+    try:
+        while not sub.closed:
+            sub.clear()
+            state = await run_in_threadpool(load_sync_state, site, location, last_etag)
+            if state is None:
+                await websocket.close(code=4404, reason="Device non enregistré.")
+                return
+
+            etag, payload = state
+            if payload is not None:
+                await websocket.send_json({"etag": etag, "config": payload})
+                last_etag = etag
+
+            # Revérification périodique pour les changements faits par un autre worker
+            await sub.wait(settings.push_recheck_seconds)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+        notifier.unsubscribe(sub)
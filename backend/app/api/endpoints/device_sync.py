@@ -1,55 +1,79 @@
 # app/api/endpoints/device_sync.py
-from fastapi import APIRouter, HTTPException, Query, Depends, Request
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.api.deps import get_db
-from app.services.device import get_device_by_name, update_device_status
+from app.api.deps import get_db, get_read_db, get_async_db
+from app.core.config import settings
+from app.core.heartbeat import heartbeat_buffer
+from app.core.http_cache import etag_matches, conditional_file_response, parse_range
+from app.core.metrics import heartbeats_received, sync_responses, media_bytes_served
+from app.core.presence import presence, to_timestamp
+from app.core.responses import FastJSONResponse
+from app.models.device import Device
+from app.services.device import (
+    get_device_snapshot_by_name, get_device_snapshot_by_name_async, update_device_status_async
+)
+from app.services.sync import compute_sync_etag, build_sync_payload, build_manifest
+from app.services.bundle import plan_bundle, iter_bundle
 from app.schemas.device import DeviceStatus
 from typing import Optional
+from datetime import datetime
 import os
+import json
+import stat
+import hashlib
 
 router = APIRouter()
 
-MEDIA_ROOT = "/app/media"
+MEDIA_ROOT = settings.media_root
 
 @router.get("/sync")
 def sync_device(
+    request: Request,
     site: str = Query(...),
     location: str = Query(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Endpoint appelé régulièrement par les Raspberry Pi pour récupérer leur configuration"""
     device_name = f"{site}-{location}"
-    device = get_device_by_name(db, device_name)
+    device = get_device_snapshot_by_name(db, device_name)
 
     if not device:
         raise HTTPException(status_code=404, detail="Device non enregistré.")
-    
-    if not device.enabled:
-        return {
-            "device": device_name,
-            "enabled": False,
-            "message": "Device désactivé"
-        }
-
-    # Récupère le chemin vers les médias
-    media_path = os.path.join(MEDIA_ROOT, site, location)
-    playlist_path = os.path.join(media_path, "playlist.txt")
-
-    playlist_files = []
-    if os.path.exists(playlist_path):
-        with open(playlist_path, "r") as f:
-            playlist_files = [line.strip() for line in f.readlines() if line.strip()]
-
-    # Retourne la configuration et les actions en attente
-    return {
-        "device": device_name,
-        "enabled": device.enabled,
-        "playlist": playlist_files,
-        "volume": device.volume,
-        "screen_on": device.screen_on,
-        "schedule": device.schedule,
-        "pending_actions": device.pending_actions or {}
-    }
+
+    # Requête conditionnelle : si la configuration n'a pas changé, on répond 304 sans corps
+    etag = compute_sync_etag(device, site, location)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        sync_responses.inc(1, "not_modified")
+        return Response(status_code=304, headers=headers)
+
+    sync_responses.inc(1, "modified")
+    return FastJSONResponse(build_sync_payload(device, site, location), headers=headers)
+
+@router.get("/manifest")
+def device_manifest(
+    request: Request,
+    site: str = Query(...),
+    location: str = Query(...),
+    db: Session = Depends(get_db)
+):
+    """Manifeste de la playlist du device (taille, mtime, SHA-256 par fichier)"""
+    device_name = f"{site}-{location}"
+    device = get_device_snapshot_by_name(db, device_name)
+
+    if not device or not device.enabled:
+        raise HTTPException(status_code=403, detail="Accès non autorisé")
+
+    files = build_manifest(site, location)
+    etag = '"' + hashlib.sha1(json.dumps(files, sort_keys=True).encode("utf-8")).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    return FastJSONResponse({"device": device_name, "files": files}, headers=headers)
 
 @router.post("/heartbeat")
 async def device_heartbeat(
@@ -57,45 +81,121 @@ async def device_heartbeat(
     location: str = Query(...),
     status: DeviceStatus = ...,
     request: Request = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Heartbeat envoyé par les Raspberry Pi pour signaler leur état"""
     device_name = f"{site}-{location}"
-    device = get_device_by_name(db, device_name)
+    device = await get_device_snapshot_by_name_async(db, device_name)
 
     if not device:
         raise HTTPException(status_code=404, detail="Device non enregistré.")
     
+    heartbeats_received.inc()
+    
     # Récupère l'IP du client
     if not status.ip_address and request:
         status.ip_address = request.client.host
 
-    # Met à jour le statut
-    update_device_status(db, device, status)
+    # Met à jour le statut : via le tampon d'écriture groupée s'il tourne
+    seen_at = datetime.utcnow()
+    if heartbeat_buffer.running:
+        heartbeat_buffer.submit(device.id, status, seen_at)
+    else:
+        device_row = await db.get(Device, device.id)
+        await update_device_status_async(db, device_row, status)
+        seen_at = device_row.last_seen
+
+    # Suivi de présence en mémoire (détection hors ligne)
+    if status.is_online:
+        presence.touch(device.id, to_timestamp(seen_at))
+    else:
+        presence.forget(device.id)
 
-    return {
+    return FastJSONResponse({
         "status": "OK",
         "device": device_name,
-        "timestamp": device.last_seen
-    }
+        "timestamp": seen_at
+    })
+
+def _stat_file(path: str) -> Optional[os.stat_result]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st if stat.S_ISREG(st.st_mode) else None
 
 @router.get("/download/{site}/{location}/{filename}")
 async def download_media(
+    request: Request,
     site: str,
     location: str,
     filename: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Télécharge un fichier média spécifique"""
+    """Télécharge un fichier média spécifique (reprise via Range, revalidation via ETag)"""
     device_name = f"{site}-{location}"
-    device = get_device_by_name(db, device_name)
+    device = await get_device_snapshot_by_name_async(db, device_name)
 
     if not device or not device.enabled:
         raise HTTPException(status_code=403, detail="Accès non autorisé")
 
+    # Le stat est fait hors de la boucle asyncio
     file_path = os.path.join(MEDIA_ROOT, site, location, filename)
-    if not os.path.exists(file_path):
+    st = await run_in_threadpool(_stat_file, file_path)
+    if st is None:
         raise HTTPException(status_code=404, detail="Fichier non trouvé")
 
-    from fastapi.responses import FileResponse
-    return FileResponse(file_path)
\ No newline at end of file
+    response = conditional_file_response(request, file_path, st)
+    if response.status_code in (200, 206):
+        media_bytes_served.inc(int(response.headers.get("content-length", 0)), "file")
+    return response
+
+@router.get("/bundle")
+async def download_bundle(
+    request: Request,
+    site: str = Query(...),
+    location: str = Query(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Archive tar de toute la playlist du device (playlist.txt inclus), générée à la volée.
+    Reprise possible avec Range: bytes=<offset>- (et If-Range).
+    """
+    device_name = f"{site}-{location}"
+    device = await get_device_snapshot_by_name_async(db, device_name)
+
+    if not device or not device.enabled:
+        raise HTTPException(status_code=403, detail="Accès non autorisé")
+
+    segments, total, etag = await run_in_threadpool(plan_bundle, site, location)
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f'attachment; filename="{device_name}.tar"',
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    start, end, status_code = 0, total - 1, 200
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, total)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{total}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+
+    headers["Content-Length"] = str(end - start + 1)
+    media_bytes_served.inc(end - start + 1, "bundle")
+    return StreamingResponse(
+        iter_bundle(segments, start, end),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/x-tar",
+    )
\ No newline at end of file
@@ -1,7 +1,9 @@
 #app/api/endpoints/media.py
 from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.api.deps import get_db, require_admin_or_superadmin
+from app.core.config import settings
 from app.services import media
 from app.schemas.media import MediaList
 from typing import List
@@ -15,11 +17,20 @@ async def upload_file(
     file: UploadFile = File(...),
     current_user=Depends(require_admin_or_superadmin),
 ):
+    # Taille annoncée par le client : rejet immédiat avant toute copie
+    if file.size is not None and file.size > settings.media_max_upload_bytes:
+        raise HTTPException(status_code=413, detail="Fichier trop volumineux")
+    
+    # Copie, calcul de l'empreinte et publication hors de la boucle asyncio
     try:
-        path = media.save_file(file, site_name, replace=replace)
-        return {"status": "success", "file_path": path}
+        stored = await run_in_threadpool(
+            media.save_file, file, site_name, replace, settings.media_max_upload_bytes
+        )
+        return {"status": "success", **stored}
     except FileExistsError:
         raise HTTPException(status_code=409, detail="Fichier déjà existant")
+    except media.FileTooLargeError:
+        raise HTTPException(status_code=413, detail="Fichier trop volumineux")
 
 @router.get("/list", response_model=MediaList, summary="Lister les fichiers")
 def list_media(site_name: str, current_user=Depends(require_admin_or_superadmin)):
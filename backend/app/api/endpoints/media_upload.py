@@ -0,0 +1,98 @@
+# app/api/endpoints/media_upload.py
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response
+from app.api.deps import require_admin_or_superadmin
+from app.core.config import settings
+from app.schemas.media import UploadSessionCreate, UploadSessionRead
+from app.services import media, upload
+
+router = APIRouter()
+
+# Protocole d'upload reprenable :
+#   POST   /media/uploads                -> crée la session
+#   PATCH  /media/uploads/{id}           -> envoie un morceau (en-tête Upload-Offset, corps brut)
+#   HEAD   /media/uploads/{id}           -> offset courant (en-tête Upload-Offset)
+#   POST   /media/uploads/{id}/complete  -> publie le fichier
+#   DELETE /media/uploads/{id}           -> abandonne la session
+
+def _get_session_or_404(upload_id: str):
+    try:
+        return upload.get_session(upload_id)
+    except upload.UploadSessionNotFound:
+        raise HTTPException(status_code=404, detail="Session d'upload introuvable")
+
+@router.post("/", response_model=UploadSessionRead, status_code=201, summary="Créer une session d'upload")
+def create_upload_session(
+    data: UploadSessionCreate,
+    current_user=Depends(require_admin_or_superadmin),
+):
+    if data.size is not None and data.size > settings.media_max_upload_bytes:
+        raise HTTPException(status_code=413, detail="Fichier trop volumineux")
+    return upload.create_session(data.site_name, data.filename, data.size, data.replace)
+
+@router.get("/{upload_id}", response_model=UploadSessionRead, summary="État d'une session d'upload")
+def get_upload_session(
+    upload_id: str,
+    response: Response,
+    current_user=Depends(require_admin_or_superadmin),
+):
+    session = _get_session_or_404(upload_id)
+    response.headers["Upload-Offset"] = str(session["offset"])
+    return session
+
+@router.head("/{upload_id}", summary="Offset courant d'une session d'upload")
+def head_upload_session(
+    upload_id: str,
+    current_user=Depends(require_admin_or_superadmin),
+):
+    session = _get_session_or_404(upload_id)
+    return Response(headers={"Upload-Offset": str(session["offset"]), "Cache-Control": "no-store"})
+
+@router.patch("/{upload_id}", summary="Envoyer un morceau")
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+    current_user=Depends(require_admin_or_superadmin),
+):
+    try:
+        offset = await upload.append_chunk(
+            upload_id, upload_offset, request.stream(), settings.media_max_upload_bytes
+        )
+    except upload.UploadSessionNotFound:
+        raise HTTPException(status_code=404, detail="Session d'upload introuvable")
+    except upload.UploadOffsetMismatch as e:
+        raise HTTPException(
+            status_code=409,
+            detail="Offset incorrect",
+            headers={"Upload-Offset": str(e.offset)},
+        )
+    except media.FileTooLargeError:
+        raise HTTPException(status_code=413, detail="Fichier trop volumineux")
+
+    return Response(status_code=204, headers={"Upload-Offset": str(offset)})
+
+@router.post("/{upload_id}/complete", summary="Finaliser l'upload")
+async def complete_upload(
+    upload_id: str,
+    current_user=Depends(require_admin_or_superadmin),
+):
+    try:
+        stored = await upload.complete_session(upload_id)
+    except upload.UploadSessionNotFound:
+        raise HTTPException(status_code=404, detail="Session d'upload introuvable")
+    except upload.UploadIncomplete as e:
+        raise HTTPException(status_code=409, detail=f"Upload incomplet ({e})")
+    except FileExistsError:
+        raise HTTPException(status_code=409, detail="Fichier déjà existant")
+    return {"status": "success", **stored}
+
+@router.delete("/{upload_id}", summary="Abandonner une session d'upload")
+def abort_upload(
+    upload_id: str,
+    current_user=Depends(require_admin_or_superadmin),
+):
+    try:
+        upload.delete_session(upload_id)
+    except upload.UploadSessionNotFound:
+        raise HTTPException(status_code=404, detail="Session d'upload introuvable")
+    return {"status": "deleted", "id": upload_id}
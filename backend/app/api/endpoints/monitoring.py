@@ -0,0 +1,100 @@
+# app/api/endpoints/monitoring.py
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.api.deps import require_superadmin
+from app.core.cache import registry as cache_registry
+from app.core.config import settings
+from app.core.database import engine, async_engine, read_engine
+from app.core.heartbeat import heartbeat_buffer
+from app.core.instrumentation import query_metrics
+from app.core.metrics import registry, CONTENT_TYPE
+from app.core.notifier import notifier
+from app.schemas.user import UserRead
+from app.services.auth import password_hasher
+
+router = APIRouter()
+# Monté à la racine (/metrics), hors du préfixe /api
+metrics_router = APIRouter()
+
+@router.get("/db")
+def database_statistics(current_user: UserRead = Depends(require_superadmin)):
+    """Requêtes SQL agrégées par route, instructions les plus lentes et N+1 détectés"""
+    return query_metrics.snapshot()
+
+@router.delete("/db")
+def reset_database_statistics(current_user: UserRead = Depends(require_superadmin)):
+    """Remet les agrégats à zéro (avant une mesure)"""
+    query_metrics.reset()
+    return {"message": "Statistiques réinitialisées"}
+
+@metrics_router.get("/metrics", include_in_schema=False)
+def prometheus_metrics(authorization: Optional[str] = Header(None)):
+    """
+    Métriques au format texte Prometheus, protégées par metrics_token.
+    Sans token configuré, l'accès n'est ouvert qu'en mode debug.
+    """
+    if settings.metrics_token:
+        expected = f"Bearer {settings.metrics_token}"
+        if not authorization or not hmac.compare_digest(authorization, expected):
+            raise HTTPException(status_code=401, detail="Not authenticated")
+    elif not settings.debug:
+        raise HTTPException(status_code=403, detail="Métriques désactivées : définir METRICS_TOKEN")
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+# Valeurs lues uniquement au moment de la collecte
+
+@registry.collector
+def collect_db_pools():
+    samples = {"checked_out": [], "overflow": [], "size": []}
+    engines = [("sync", engine), ("async", async_engine.sync_engine)]
+    if read_engine is not engine:
+        engines.append(("read", read_engine))
+    for name, db_engine in engines:
+        pool = db_engine.pool
+        for key, method in (("checked_out", "checkedout"), ("overflow", "overflow"), ("size", "size")):
+            if hasattr(pool, method):
+                # overflow() est négatif tant que le pool n'est pas plein
+                value = max(getattr(pool, method)(), 0)
+                samples[key].append(("", {"engine": name}, value))
+    return [
+        ("db_pool_connections_checked_out", "gauge", "Connexions du pool en cours d'utilisation", samples["checked_out"]),
+        ("db_pool_overflow", "gauge", "Connexions ouvertes au-delà de la taille du pool", samples["overflow"]),
+        ("db_pool_size", "gauge", "Taille configurée du pool", samples["size"]),
+    ]
+
+@registry.collector
+def collect_heartbeat_buffer():
+    stats = heartbeat_buffer.metrics()
+    return [
+        ("signage_heartbeat_buffer_pending", "gauge", "Heartbeats en attente d'écriture", [("", {}, stats["pending"])]),
+        ("signage_heartbeat_buffer_coalesced_total", "counter", "Heartbeats fusionnés avant écriture", [("", {}, stats["coalesced"])]),
+        ("signage_heartbeat_buffer_flushes_total", "counter", "Écritures groupées effectuées", [("", {}, stats["flushes"])]),
+        ("signage_heartbeat_buffer_rows_total", "counter", "Lignes écrites par les écritures groupées", [("", {}, stats["rows_flushed"])]),
+        ("signage_heartbeat_buffer_errors_total", "counter", "Échecs d'écriture groupée", [("", {}, stats["errors"])]),
+        ("signage_heartbeat_buffer_lag_seconds", "gauge", "Délai entre réception et écriture du dernier lot", [("", {}, stats["last_flush_lag_ms"] / 1000)]),
+    ]
+
+@registry.collector
+def collect_caches():
+    hits, misses, sizes = [], [], []
+    for name, cache in cache_registry.items():
+        stats = cache.stats()
+        hits.append(("", {"cache": name}, stats["hits"]))
+        misses.append(("", {"cache": name}, stats["misses"]))
+        sizes.append(("", {"cache": name}, stats["size"]))
+    return [
+        ("signage_cache_hits_total", "counter", "Lectures servies par le cache", hits),
+        ("signage_cache_misses_total", "counter", "Lectures absentes du cache", misses),
+        ("signage_cache_entries", "gauge", "Entrées en cache", sizes),
+    ]
+
+@registry.collector
+def collect_runtime():
+    hashing = password_hasher.metrics()
+    return [
+        ("signage_push_connections", "gauge", "Connexions push (long-poll, WebSocket) ouvertes", [("", {}, notifier.connection_count)]),
+        ("signage_password_hash_queue", "gauge", "Calculs de hash en attente ou en cours", [("", {}, hashing["in_flight"])]),
+        ("signage_password_hash_rejected_total", "counter", "Demandes de hash refusées (429)", [("", {}, hashing["rejected"])]),
+    ]
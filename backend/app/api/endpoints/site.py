@@ -1,14 +1,15 @@
 # app/api/endpoints/site.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from app.core.pagination import PageRequest
 from app.schemas.site import SiteCreate, SiteRead, SiteUpdate
 from app.services.site import (
     create_site, get_site_by_id, get_site_by_name, 
-    get_all_sites, update_site, delete_site
+    get_all_sites, list_sites_page, update_site, delete_site
 )
-from app.api.deps import get_db, require_superadmin, get_current_user
-from app.models.user import User
+from app.api.deps import get_db, get_read_db, require_superadmin, get_current_principal
+from app.schemas.user import UserRead
 
 router = APIRouter()
 
@@ -16,7 +17,7 @@ router = APIRouter()
 def create_new_site(
     site: SiteCreate, 
     db: Session = Depends(get_db), 
-    current_user: User = Depends(require_superadmin)
+    current_user: UserRead = Depends(require_superadmin)
 ):
     """Créer un nouveau site (seul le superadmin peut le faire)"""
     existing_site = get_site_by_name(db, site.name)
@@ -27,17 +28,33 @@ def create_new_site(
 
 @router.get("/", response_model=List[SiteRead])
 def list_sites(
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    name_prefix: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db), 
+    current_user: UserRead = Depends(get_current_principal)
 ):
-    """Lister tous les sites (accessible à tous les utilisateurs connectés)"""
-    return get_all_sites(db)
+    """Lister les sites (accessible à tous les utilisateurs connectés), paginé avec cursor/limit"""
+    try:
+        page = PageRequest(cursor, limit, fields, SiteRead.model_fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # La liste complète sans filtre reste servie par le cache des sites
+    if page.legacy and not name_prefix:
+        return get_all_sites(db)
+    
+    sites = list_sites_page(db, page, name_prefix)
+    if page.legacy:
+        return sites
+    return page.response(sites, SiteRead)
 
 @router.get("/{site_id}", response_model=SiteRead)
 def get_site(
     site_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserRead = Depends(get_current_principal)
 ):
     """Récupérer un site par son ID"""
     site = get_site_by_id(db, site_id)
@@ -50,7 +67,7 @@ def update_site_info(
     site_id: int,
     site_update: SiteUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_superadmin)
+    current_user: UserRead = Depends(require_superadmin)
 ):
     """Modifier un site (seul le superadmin peut le faire)"""
     site = update_site(db, site_id, site_update)
@@ -62,7 +79,7 @@ def update_site_info(
 def delete_site_endpoint(
     site_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_superadmin)
+    current_user: UserRead = Depends(require_superadmin)
 ):
     """Supprimer un site (seul le superadmin peut le faire)"""
     success = delete_site(db, site_id)
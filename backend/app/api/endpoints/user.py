@@ -1,40 +1,59 @@
 # app/api/endpoints/user.py 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from app.core.pagination import PageRequest
 from app.schemas.user import UserCreate, UserRead, UserUpdate
-from app.services.user import create_user, get_user_by_email, get_all_users, update_user, delete_user
+from app.services.user import create_user, get_user_by_email, list_users_page, update_user, delete_user
 from app.api.deps import get_db, require_superadmin, get_current_user
 from app.models.user import User
+from app.services.auth import get_password_hash_async
 
 router = APIRouter()
 
 @router.post("/", response_model=UserRead)
-def create_new_user(
+async def create_new_user(
     user: UserCreate, 
     db: Session = Depends(get_db), 
-    current_user: User = Depends(require_superadmin)
+    current_user: UserRead = Depends(require_superadmin)
 ):
     """Créer un nouvel utilisateur (seul le superadmin peut le faire)"""
-    existing_user = get_user_by_email(db, user.email)
+    existing_user = await run_in_threadpool(get_user_by_email, db, user.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Un utilisateur avec cet email existe déjà")
     
-    return create_user(db, user)
+    # bcrypt sur le pool dédié et borné, pas sur le threadpool partagé
+    hashed_password = await get_password_hash_async(user.password)
+    return await run_in_threadpool(create_user, db, user, hashed_password)
 
 @router.get("/", response_model=List[UserRead])
 def list_users(
+    site_id: Optional[int] = None,
+    role: Optional[str] = None,
+    email_prefix: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = None,
     db: Session = Depends(get_db), 
-    current_user: User = Depends(require_superadmin)
+    current_user: UserRead = Depends(require_superadmin)
 ):
-    """Lister tous les utilisateurs (seul le superadmin peut le faire)"""
-    return get_all_users(db)
+    """Lister les utilisateurs (seul le superadmin peut le faire), paginé avec cursor/limit"""
+    try:
+        page = PageRequest(cursor, limit, fields, UserRead.model_fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    users = list_users_page(db, page, site_id, role, email_prefix)
+    if page.legacy:
+        return users
+    return page.response(users, UserRead)
 
 @router.get("/{user_id}", response_model=UserRead)
 def get_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_superadmin)
+    current_user: UserRead = Depends(require_superadmin)
 ):
     """Récupérer un utilisateur par son ID"""
     user = db.query(User).filter(User.id == user_id).first()
@@ -43,14 +62,17 @@ def get_user(
     return user
 
 @router.put("/{user_id}", response_model=UserRead)
-def update_user_info(
+async def update_user_info(
     user_id: int,
     user_update: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_superadmin)
+    current_user: UserRead = Depends(require_superadmin)
 ):
     """Modifier un utilisateur (seul le superadmin peut le faire)"""
-    user = update_user(db, user_id, user_update)
+    hashed_password = None
+    if user_update.password:
+        hashed_password = await get_password_hash_async(user_update.password)
+    user = await run_in_threadpool(update_user, db, user_id, user_update, hashed_password)
     if not user:
         raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
     return user
@@ -59,7 +81,7 @@ def update_user_info(
 def delete_user_account(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_superadmin)
+    current_user: UserRead = Depends(require_superadmin)
 ):
     """Supprimer un utilisateur (seul le superadmin peut le faire)"""
     if user_id == current_user.id:
@@ -1,11 +1,15 @@
 #app/api/routes.py
 from fastapi import APIRouter
-from app.api.endpoints import auth, site, user, media, device, device_sync
+from app.api.endpoints import auth, site, user, media, media_upload, device, device_sync, device_push, monitoring
 
 router = APIRouter()
 router.include_router(auth.router, prefix="/auth", tags=["auth"])
 router.include_router(site.router, prefix="/sites", tags=["sites"])
 router.include_router(user.router, prefix="/users", tags=["users"])
 router.include_router(media.router, prefix="/media", tags=["media"])
+router.include_router(media_upload.router, prefix="/media/uploads", tags=["media"])
+# Les routes de synchronisation doivent précéder /devices/{device_id}
+router.include_router(device_sync.router, prefix="/devices", tags=["sync"])
+router.include_router(device_push.router, prefix="/devices", tags=["sync"])
 router.include_router(device.router, prefix="/devices", tags=["devices"])
-router.include_router(device_sync.router, prefix="/devices", tags=["sync"])
\ No newline at end of file
+router.include_router(monitoring.router, prefix="/monitoring", tags=["monitoring"])
\ No newline at end of file
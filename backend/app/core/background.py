@@ -1,45 +1,111 @@
 # app/core/background.py
 import asyncio
-from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
-from app.models.device import Device
+import time
+import logging
 from datetime import datetime, timedelta
+from typing import List
+from sqlalchemy import update, or_, select, func
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import devices_by_state, loop_lag
+from app.core.presence import presence
+from app.models.device import Device
+from app.services.upload import cleanup_sessions
+
+logger = logging.getLogger(__name__)
+# Transitions de présence : peuvent arriver en rafale (coupure réseau d'un site), logger limité en débit
+devices_logger = logging.getLogger("app.devices")
+
+# Intervalle de vérification des échéances du suivi de présence
+PRESENCE_TICK_SECONDS = 1
+# Intervalle de recomptage du nombre total de devices (jauge hors ligne)
+DEVICE_COUNT_REFRESH_SECONDS = 60
+# Identifiants cités dans le log des passages hors ligne (une coupure de site peut en expirer des milliers)
+OFFLINE_LOG_SAMPLE = 10
+# Intervalle de nettoyage des sessions d'upload abandonnées
+UPLOAD_CLEANUP_INTERVAL_SECONDS = 600
+
+async def mark_devices_offline(device_ids: List[int]) -> int:
+    """Marque un lot de devices hors ligne en un seul UPDATE"""
+    # Garde-fou : un heartbeat reçu par un autre worker a pu rafraîchir last_seen entre-temps
+    threshold = datetime.utcnow() - timedelta(seconds=presence.offline_after)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(Device)
+            .where(
+                Device.id.in_(device_ids),
+                Device.is_online == True,
+                or_(Device.last_seen < threshold, Device.last_seen == None)
+            )
+            .values(is_online=False, is_playing=False)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
+
+async def count_devices() -> int:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(func.count(Device.id)))
+        return result.scalar_one()
 
 async def monitor_devices():
     """Surveillance des devices pour détecter ceux qui sont hors ligne"""
+    # Reconstruire le suivi de présence depuis la base (attend la création des tables)
     while True:
         try:
-            db: Session = SessionLocal()
-            
-            # Marquer comme hors ligne les devices qui n'ont pas donné signe de vie depuis 5 minutes
-            offline_threshold = datetime.utcnow() - timedelta(minutes=5)
-            
-            # Vérifier si la table existe (pour éviter l'erreur au démarrage)
-            try:
-                offline_devices = db.query(Device).filter(
-                    Device.last_seen < offline_threshold,
-                    Device.is_online == True
-                ).all()
-                
-                for device in offline_devices:
-                    device.is_online = False
-                    device.is_playing = False
-                    print(f"Device {device.name} marqué comme hors ligne")
-                
-                db.commit()
-                
-            except Exception as e:
-                # Si la table n'existe pas encore, ignorer silencieusement
-                if "does not exist" in str(e):
-                    print("Tables pas encore créées, attente...")
-                else:
-                    print(f"Erreur dans la surveillance des devices: {e}")
-                db.rollback()
-            finally:
-                db.close()
-                
+            await presence.load()
+            break
         except Exception as e:
-            print(f"Erreur dans monitor_devices: {e}")
-        
-        # Attendre 30 secondes avant la prochaine vérification
-        await asyncio.sleep(30)
\ No newline at end of file
+            if "does not exist" in str(e) or "no such table" in str(e):
+                logger.info("Tables pas encore créées, attente...")
+            else:
+                logger.exception("Erreur lors du chargement du suivi de présence")
+            await asyncio.sleep(PRESENCE_TICK_SECONDS)
+
+    loop = asyncio.get_running_loop()
+    total_devices, counted_at = None, 0.0
+    while True:
+        expired = presence.expire(time.time())
+        if expired:
+            try:
+                count = await mark_devices_offline(expired)
+                devices_logger.info(
+                    "Devices marqués hors ligne",
+                    extra={"count": count, "device_ids_sample": expired[:OFFLINE_LOG_SAMPLE]},
+                )
+            except Exception:
+                logger.exception("Erreur dans monitor_devices")
+                # Réessayer au prochain tour, sauf pour les devices revenus entre-temps
+                retry_at = time.time() - presence.offline_after
+                for device_id in expired:
+                    if device_id not in presence:
+                        presence.touch(device_id, retry_at)
+
+        # Jauges online / offline exposées par /metrics
+        if total_devices is None or loop.time() - counted_at >= DEVICE_COUNT_REFRESH_SECONDS:
+            try:
+                total_devices, counted_at = await count_devices(), loop.time()
+            except Exception:
+                logger.exception("Erreur lors du comptage des devices")
+        online = presence.online_count
+        devices_by_state.set(online, "online")
+        if total_devices is not None:
+            devices_by_state.set(max(total_devices - online, 0), "offline")
+
+        # Le retard du réveil mesure l'occupation de la boucle asyncio
+        before = loop.time()
+        await asyncio.sleep(PRESENCE_TICK_SECONDS)
+        loop_lag.set(max(loop.time() - before - PRESENCE_TICK_SECONDS, 0.0))
+
+async def cleanup_upload_sessions():
+    """Supprime périodiquement les sessions d'upload par morceaux abandonnées"""
+    while True:
+        try:
+            removed = await run_in_threadpool(cleanup_sessions, settings.upload_session_ttl_seconds)
+            if removed:
+                logger.info("Sessions d'upload abandonnées supprimées", extra={"count": removed})
+        except Exception:
+            logger.exception("Erreur lors du nettoyage des sessions d'upload")
+
+        await asyncio.sleep(UPLOAD_CLEANUP_INTERVAL_SECONDS)
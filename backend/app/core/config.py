@@ -1,6 +1,7 @@
 # app/core/config.py
+import logging
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     """Configuration de l'application Digital Signage"""
@@ -9,6 +10,19 @@ class Settings(BaseSettings):
     database_url: str
     secret_key: str
     
+    # Réplique en lecture seule (optionnelle) pour les endpoints de consultation
+    database_read_url: Optional[str] = None
+    
+    # Pool de connexions (ignoré pour SQLite) ; 0 désactive le statement_timeout
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: int = 30
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0
+    # Appliquer les migrations en attente au démarrage (sinon : python -m app.core.migrations upgrade)
+    db_auto_migrate: bool = True
+    
     # Variables avec valeurs par défaut
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
@@ -23,6 +37,64 @@ class Settings(BaseSettings):
     debug: bool = False
     serve_frontend: bool = True
     log_level: str = "INFO"
+    # Format des logs : "text" (lisible) ou "json" (une ligne JSON par entrée, pour l'agrégation)
+    log_format: str = "text"
+    # Messages par seconde au-delà desquels un logger est limité (les messages ignorés sont comptés)
+    log_rate_limits: Dict[str, float] = {"app.devices": 5.0, "app.db.n_plus_one": 1.0}
+    
+    # Canal push des devices (long-poll / WebSocket)
+    push_max_wait_seconds: int = 60
+    push_recheck_seconds: int = 300
+    
+    # Écriture groupée des heartbeats
+    heartbeat_flush_interval_ms: int = 1000
+    heartbeat_flush_max_entries: int = 500
+    
+    # Délai sans heartbeat au-delà duquel un device est considéré hors ligne
+    device_offline_after_seconds: int = 300
+    
+    # Dossier des médias (volume monté dans le conteneur)
+    media_root: str = "/app/media"
+    
+    # Taille maximale d'un média uploadé (2 Go par défaut)
+    media_max_upload_bytes: int = 2 * 1024 * 1024 * 1024
+    
+    # Sessions d'upload par morceaux abandonnées supprimées après ce délai d'inactivité
+    upload_session_ttl_seconds: int = 24 * 3600
+    
+    # Délai entre deux vérifications (stat) d'un playlist.txt en cache
+    playlist_revalidate_seconds: int = 10
+    
+    # Cache des devices et sites (recherche par nom)
+    entity_cache_max_entries: int = 10000
+    entity_cache_ttl_seconds: int = 30
+    # Instrumentation des requêtes SQL (en-têtes X-DB-* en mode debug)
+    db_instrumentation: bool = True
+    db_n_plus_one_threshold: int = 5
+    db_slow_statements_kept: int = 20
+    
+    # Jeton exigé par /metrics (Authorization: Bearer ...) ; sans jeton, /metrics n'est servi qu'en mode debug
+    metrics_token: Optional[str] = None
+    
+    # Compression des réponses de l'API
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    
+    # Pagination des listes (devices, utilisateurs, sites)
+    api_page_default_limit: int = 100
+    api_page_max_limit: int = 1000
+    # Statistiques du tableau de bord (0 pour désactiver le cache)
+    device_stats_cache_ttl_seconds: int = 5
+    
+    # Cache des tokens vérifiés (borné aussi par l'expiration du token)
+    token_cache_max_entries: int = 10000
+    token_cache_ttl_seconds: int = 300
+    
+    # Hash des mots de passe (pool dédié, refus en 429 au-delà de la file)
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_queue_size: int = 32
     
     model_config = {
         "env_file": ".env",
@@ -35,16 +107,14 @@ settings = Settings()
 
 def print_config_summary():
     """Affiche un résumé de la configuration au démarrage"""
-    print("🔧 Configuration de l'application:")
-    print(f"   🌐 Domaine: {settings.domain or 'Non défini'}")
-    print(f"   🗄️  Base de données: Configurée")
-    print(f"   🔐 JWT: {settings.algorithm}, expire dans {settings.access_token_expire_minutes}min")
-    print(f"   📜 Log level: {settings.log_level}")
-    
-    if settings.superadmin_email:
-        print(f"   👤 Superadmin: {settings.superadmin_email}")
-    
-    if settings.debug:
-        print("   ⚠️  Mode DEBUG activé")
-    else:
-        print("   🚀 Mode PRODUCTION")
\ No newline at end of file
+    logging.getLogger("app.config").info(
+        "🔧 Configuration de l'application",
+        extra={
+            "domain": settings.domain or "Non défini",
+            "jwt": f"{settings.algorithm}/{settings.access_token_expire_minutes}min",
+            "log_level": settings.log_level,
+            "log_format": settings.log_format,
+            "superadmin": settings.superadmin_email,
+            "mode": "DEBUG" if settings.debug else "PRODUCTION",
+        },
+    )
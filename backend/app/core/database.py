@@ -1,12 +1,71 @@
 #app/core/database
+from typing import Any, Dict
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.instrumentation import instrument_engine
 
 SQLALCHEMY_DATABASE_URL = settings.database_url
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Drivers asynchrones utilisés par les endpoints appelés par les devices
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(url: str) -> str:
+    """Convertit l'URL synchrone en URL utilisant un driver asyncio"""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+def engine_options(url: str, asynchronous: bool = False) -> Dict[str, Any]:
+    """
+    Options du pool et de la connexion. SQLite (fichier local, développement) garde
+    les valeurs par défaut de SQLAlchemy ; PostgreSQL reçoit la taille du pool, le
+    recyclage, le pre-ping et le statement_timeout côté serveur.
+    """
+    if url.startswith("sqlite"):
+        return {}
+
+    options: Dict[str, Any] = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if settings.db_statement_timeout_ms and url.startswith("postgres"):
+        timeout = str(settings.db_statement_timeout_ms)
+        if asynchronous:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_DATABASE_URL = get_async_database_url(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, asynchronous=True))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Réplique en lecture seule pour les endpoints de consultation (tableau de bord, sync des devices) ;
+# sans DATABASE_READ_URL, les lectures passent par la base principale
+if settings.database_read_url:
+    read_engine = create_engine(settings.database_read_url, **engine_options(settings.database_read_url))
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Comptage et temps des requêtes SQL, par requête HTTP
+if settings.db_instrumentation:
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+    if read_engine is not engine:
+        instrument_engine(read_engine)
+
 Base = declarative_base()
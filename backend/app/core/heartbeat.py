@@ -0,0 +1,181 @@
+# app/core/heartbeat.py
+import asyncio
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Tuple
+from sqlalchemy import update, bindparam
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.device import Device
+from app.schemas.device import DeviceStatus
+
+logger = logging.getLogger("app.devices")
+
+# Colonnes écrites seulement si leur valeur a changé depuis le dernier flush
+OPTIONAL_COLUMNS = ("ip_address", "mac_address", "system_info")
+
+class HeartbeatBuffer:
+    """
+    Tampon des heartbeats : accepte les statuts immédiatement, ne garde que le dernier
+    état par device et les écrit par lots (un UPDATE groupé toutes les N ms ou N entrées).
+    """
+
+    def __init__(self, flush_interval_ms: int, max_entries: int):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_entries = max_entries
+        self.running = False
+
+        # device_id -> (colonnes à écrire, instant de réception du premier heartbeat non écrit)
+        self._pending: Dict[int, Tuple[Dict[str, Any], float]] = {}
+        # device_id -> dernières valeurs écrites des colonnes optionnelles
+        self._persisted: Dict[int, Dict[str, Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+        self.received = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.errors = 0
+        self.last_flush_duration = 0.0
+        self.last_flush_lag = 0.0
+        self.max_flush_lag = 0.0
+
+    def submit(self, device_id: int, status: DeviceStatus, seen_at: datetime):
+        """Enregistre un heartbeat (à appeler depuis la boucle asyncio)"""
+        values = {
+            "is_online": status.is_online,
+            "is_playing": status.is_playing,
+            "current_media": status.current_media,
+            "last_seen": seen_at,
+        }
+        for column in OPTIONAL_COLUMNS:
+            value = getattr(status, column)
+            if value:
+                values[column] = value
+
+        self.received += 1
+        previous = self._pending.get(device_id)
+        if previous:
+            # On conserve les colonnes optionnelles d'un heartbeat précédent non encore écrit
+            merged = {c: v for c, v in previous[0].items() if c in OPTIONAL_COLUMNS}
+            merged.update(values)
+            self._pending[device_id] = (merged, previous[1])
+            self.coalesced += 1
+        else:
+            self._pending[device_id] = (values, time.monotonic())
+
+        if len(self._pending) >= self.max_entries:
+            self._wakeup.set()
+
+    def start(self):
+        self.running = True
+        # L'événement est lié à la boucle qui l'attend : recréé à chaque démarrage
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Arrête la boucle sans l'annuler (un flush en cours va jusqu'au bout),
+        puis écrit les heartbeats restants.
+        """
+        self.running = False
+        self._wakeup.set()
+        if self._task:
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while self.running:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _requeue(self, batch: Dict[int, Tuple[Dict[str, Any], float]]):
+        """Remet un lot non écrit en attente sans écraser les heartbeats plus récents"""
+        for device_id, entry in batch.items():
+            self._pending.setdefault(device_id, entry)
+
+    async def flush(self):
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        started = time.monotonic()
+        oldest = min(received_at for _, received_at in batch.values())
+
+        rows = []
+        for device_id, (values, _) in batch.items():
+            persisted = self._persisted.get(device_id, {})
+            row = {
+                column: value for column, value in values.items()
+                if column not in OPTIONAL_COLUMNS or persisted.get(column) != value
+            }
+            row["id"] = device_id
+            rows.append(row)
+
+        try:
+            await self._write(rows)
+        except asyncio.CancelledError:
+            # Annulation pendant l'écriture (arrêt de la boucle) : le lot n'est pas perdu
+            self._requeue(batch)
+            raise
+        except Exception:
+            logger.exception("Erreur lors de l'écriture des heartbeats", extra={"batch_size": len(rows)})
+            self.errors += 1
+            self._requeue(batch)
+            return
+
+        for row in rows:
+            persisted = self._persisted.setdefault(row["id"], {})
+            for column in OPTIONAL_COLUMNS:
+                if column in row:
+                    persisted[column] = row[column]
+
+        finished = time.monotonic()
+        self.flushes += 1
+        self.rows_flushed += len(rows)
+        self.last_flush_duration = finished - started
+        self.last_flush_lag = finished - oldest
+        self.max_flush_lag = max(self.max_flush_lag, self.last_flush_lag)
+
+    async def _write(self, rows: List[Dict[str, Any]]):
+        """Un executemany par combinaison de colonnes, le tout dans une seule transaction"""
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            columns = tuple(sorted(c for c in row if c != "id"))
+            groups.setdefault(columns, []).append({f"v_{c}": v for c, v in row.items()})
+
+        table = Device.__table__
+        async with AsyncSessionLocal() as db:
+            for columns, params in groups.items():
+                stmt = (
+                    update(table)
+                    .where(table.c.id == bindparam("v_id"))
+                    .values({column: bindparam(f"v_{column}") for column in columns})
+                )
+                await db.execute(stmt, params)
+            await db.commit()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "errors": self.errors,
+            "last_flush_duration_ms": round(self.last_flush_duration * 1000, 2),
+            "last_flush_lag_ms": round(self.last_flush_lag * 1000, 2),
+            "max_flush_lag_ms": round(self.max_flush_lag * 1000, 2),
+        }
+
+heartbeat_buffer = HeartbeatBuffer(
+    settings.heartbeat_flush_interval_ms,
+    settings.heartbeat_flush_max_entries,
+)
@@ -0,0 +1,131 @@
+# app/core/http_cache.py
+import os
+import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+import anyio
+from fastapi import Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+
+FILE_CHUNK_SIZE = 64 * 1024
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Vérifie si l'en-tête If-None-Match correspond à l'ETag courant"""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    # Comparaison faible (RFC 9110) : on ignore le préfixe W/
+    current = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
+
+def file_etag(st: os.stat_result) -> str:
+    """ETag fort d'un fichier : change à chaque réécriture (inode, taille, mtime en ns)"""
+    return f'"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+def parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Analyse un en-tête Range mono-intervalle ("bytes=a-b", "bytes=a-", "bytes=-n").
+    Retourne (début, fin incluse), None si l'en-tête est ignoré (plusieurs intervalles,
+    syntaxe invalide), ou lève ValueError si l'intervalle n'est pas satisfiable.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    start_str, sep, end_str = spec.strip().partition("-")
+    if not sep or not all(part == "" or part.isdigit() for part in (start_str, end_str)):
+        return None
+
+    if start_str == "":
+        if end_str == "":
+            return None
+        suffix = int(end_str)
+        if suffix == 0:
+            raise ValueError("Range non satisfiable")
+        return max(size - suffix, 0), size - 1
+
+    start = int(start_str)
+    end = int(end_str) if end_str else size - 1
+    if start > end:
+        return None
+    if start >= size:
+        raise ValueError("Range non satisfiable")
+    return start, min(end, size - 1)
+
+async def _iter_file_range(path: str, start: int, length: int):
+    async with await anyio.open_file(path, "rb") as f:
+        await f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = await f.read(min(FILE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def conditional_file_response(request: Request, path: str, st: os.stat_result) -> Response:
+    """
+    Sert un fichier avec gestion des requêtes conditionnelles (If-None-Match,
+    If-Modified-Since -> 304) et des reprises de téléchargement (Range / If-Range -> 206).
+    """
+    etag = file_etag(st)
+    last_modified = formatdate(st.st_mtime, usegmt=True)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache",
+    }
+
+    # Revalidation du cache du device
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                since = None
+            if since is not None and int(st.st_mtime) <= since:
+                return Response(status_code=304, headers=headers)
+
+    # Reprise d'un téléchargement partiel
+    range_header = request.headers.get("range")
+    if range_header and st.st_size > 0:
+        # If-Range : la reprise n'est valable que si le fichier n'a pas changé (comparaison forte)
+        if_range = request.headers.get("if-range")
+        if if_range and if_range.strip() not in (etag, last_modified):
+            return FileResponse(path, stat_result=st, headers=headers)
+
+        try:
+            byte_range = parse_range(range_header, st.st_size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{st.st_size}"
+            return Response(status_code=416, headers=headers)
+
+        if byte_range is not None:
+            start, end = byte_range
+            length = end - start + 1
+            headers["Content-Range"] = f"bytes {start}-{end}/{st.st_size}"
+            headers["Content-Length"] = str(length)
+            media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            return StreamingResponse(
+                _iter_file_range(path, start, length),
+                status_code=206,
+                headers=headers,
+                media_type=media_type,
+            )
+
+    return FileResponse(path, stat_result=st, headers=headers)
@@ -1,10 +1,14 @@
 # app/core/init_superadmin.py
 import os
+import logging
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
+from app.core.log import setup_logging, stop_logging
 from app.models.user import User
 from app.services.auth import get_password_hash
 
+logger = logging.getLogger(__name__)
+
 def create_default_superadmin():
     """
     Crée le compte superadmin par défaut s'il n'existe pas déjà.
@@ -18,10 +22,10 @@ def create_default_superadmin():
         
         # Vérification des variables d'environnement
         if not superadmin_email or not superadmin_password:
-            print("❌ ERREUR: Les variables SUPERADMIN_EMAIL et SUPERADMIN_PASSWORD doivent être définies dans le fichier .env")
-            print("📝 Exemple dans .env:")
-            print("   SUPERADMIN_EMAIL=admin@votre-domaine.com")
-            print("   SUPERADMIN_PASSWORD=VotreMotDePasseSecurise123!")
+            logger.error(
+                "❌ ERREUR: Les variables SUPERADMIN_EMAIL et SUPERADMIN_PASSWORD doivent être définies dans le fichier .env "
+                "(exemple : SUPERADMIN_EMAIL=admin@votre-domaine.com, SUPERADMIN_PASSWORD=VotreMotDePasseSecurise123!)"
+            )
             return None
         
         # Vérifier si le superadmin existe déjà
@@ -31,18 +35,18 @@ def create_default_superadmin():
         ).first()
         
         if existing_superadmin:
-            print(f"✅ Superadmin existe déjà avec l'email: {superadmin_email}")
+            logger.info("✅ Superadmin existe déjà", extra={"email": superadmin_email})
             return existing_superadmin
         
         # Vérifier s'il existe déjà un autre superadmin
         any_superadmin = db.query(User).filter(User.role == "superadmin").first()
         if any_superadmin:
-            print(f"✅ Un superadmin existe déjà avec l'email: {any_superadmin.email}")
+            logger.info("✅ Un superadmin existe déjà", extra={"email": any_superadmin.email})
             return any_superadmin
         
         # Validation basique du mot de passe
         if len(superadmin_password) < 8:
-            print("❌ ERREUR: Le mot de passe du superadmin doit contenir au moins 8 caractères")
+            logger.error("❌ ERREUR: Le mot de passe du superadmin doit contenir au moins 8 caractères")
             return None
         
         # Créer le nouveau superadmin
@@ -58,17 +62,15 @@ def create_default_superadmin():
         db.commit()
         db.refresh(superadmin)
         
-        print(f"🎉 Superadmin créé avec succès !")
-        print(f"📧 Email: {superadmin_email}")
-        print(f"🔐 Mot de passe: [CONFIDENTIEL - défini via variable d'environnement]")
-        print(f"⚠️  IMPORTANT: Changez ce mot de passe après votre première connexion !")
+        logger.info("🎉 Superadmin créé avec succès !", extra={"email": superadmin_email})
+        logger.warning("⚠️  IMPORTANT: Changez ce mot de passe après votre première connexion !")
         
         return superadmin
         
-    except Exception as e:
+    except Exception:
         db.rollback()
-        print(f"❌ Erreur lors de la création du superadmin: {e}")
-        raise e
+        logger.exception("❌ Erreur lors de la création du superadmin")
+        raise
     finally:
         db.close()
 
@@ -81,8 +83,8 @@ def verify_superadmin_exists():
     try:
         superadmin = db.query(User).filter(User.role == "superadmin").first()
         return superadmin is not None
-    except Exception as e:
-        print(f"❌ Erreur lors de la vérification du superadmin: {e}")
+    except Exception:
+        logger.exception("❌ Erreur lors de la vérification du superadmin")
         return False
     finally:
         db.close()
@@ -103,10 +105,14 @@ def get_superadmin_info():
             }
         return {"exists": False}
     except Exception as e:
-        print(f"❌ Erreur lors de la récupération des infos superadmin: {e}")
+        logger.exception("❌ Erreur lors de la récupération des infos superadmin")
         return {"exists": False, "error": str(e)}
     finally:
         db.close()
 
 if __name__ == "__main__":
-    create_default_superadmin()
\ No newline at end of file
+    setup_logging()
+    try:
+        create_default_superadmin()
+    finally:
+        stop_logging()
\ No newline at end of file
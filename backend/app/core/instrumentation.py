@@ -0,0 +1,190 @@
+# app/core/instrumentation.py
+import re
+import time
+import logging
+import heapq
+import threading
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+# Un motif N+1 se répète à chaque appel de la route : logger limité en débit
+n_plus_one_logger = logging.getLogger("app.db.n_plus_one")
+
+_WHITESPACE = re.compile(r"\s+")
+MAX_STATEMENT_LENGTH = 300
+# Requêtes N+1 récentes conservées pour l'exposition
+MAX_N_PLUS_ONE_REPORTS = 50
+
+def normalize_statement(statement: str) -> str:
+    """Texte SQL sur une ligne ; les paramètres sont déjà des marqueurs (?, %(x)s)"""
+    return _WHITESPACE.sub(" ", statement).strip()[:MAX_STATEMENT_LENGTH]
+
+def route_template(scope: Scope) -> str:
+    """
+    Chemin complet de la route (préfixe compris) avec ses paramètres, ex. /api/devices/{device_id}.
+    Pour un routeur inclus, FastAPI range la route effective (préfixée) dans scope["fastapi"].
+    """
+    route = scope.get("fastapi", {}).get("effective_route_context") or scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class RequestStats:
+    """Requêtes SQL exécutées pendant le traitement d'une requête HTTP"""
+
+    def __init__(self, scope: Scope):
+        self.scope = scope
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.statements: Counter = Counter()
+
+    def add(self, statement: str, duration_ms: float):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.statements[statement] += 1
+        if duration_ms > self.slowest_ms:
+            self.slowest_ms = duration_ms
+            self.slowest_statement = statement
+
+    @property
+    def route(self) -> str:
+        """Route correspondante (renseignée par le routeur), ex. « GET /api/devices/{device_id} »"""
+        return f"{self.scope.get('method', 'GET')} {route_template(self.scope)}"
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Instructions répétées au moins threshold fois (motif N+1)"""
+        return [(s, n) for s, n in self.statements.most_common() if n >= threshold]
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("db_request_stats", default=None)
+
+class QueryMetrics:
+    """Agrégats par route : nombre de requêtes, temps base de données, instructions lentes, N+1"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes: Dict[str, Dict[str, Any]] = {}
+        self.background = {"queries": 0, "db_time_ms": 0.0}
+        # Tas des instructions les plus lentes : (durée, route, instruction)
+        self._slowest: List[Tuple[float, str, str]] = []
+        self.n_plus_one: Deque[Dict[str, Any]] = deque(maxlen=MAX_N_PLUS_ONE_REPORTS)
+
+    def record_statement(self, route: Optional[str], statement: str, duration_ms: float):
+        with self._lock:
+            if route is None:
+                self.background["queries"] += 1
+                self.background["db_time_ms"] += duration_ms
+            entry = (duration_ms, route or "background", statement)
+            if len(self._slowest) < settings.db_slow_statements_kept:
+                heapq.heappush(self._slowest, entry)
+            elif duration_ms > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def record_request(self, route: str, stats: RequestStats, repeated: List[Tuple[str, int]]):
+        with self._lock:
+            agg = self.routes.get(route)
+            if agg is None:
+                agg = self.routes[route] = {
+                    "requests": 0, "queries": 0, "db_time_ms": 0.0, "max_queries": 0, "n_plus_one": 0,
+                }
+            agg["requests"] += 1
+            agg["queries"] += stats.count
+            agg["db_time_ms"] += stats.total_ms
+            agg["max_queries"] = max(agg["max_queries"], stats.count)
+            if repeated:
+                agg["n_plus_one"] += 1
+                for statement, count in repeated:
+                    self.n_plus_one.append({"route": route, "statement": statement, "count": count})
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = {
+                route: {
+                    **agg,
+                    "db_time_ms": round(agg["db_time_ms"], 2),
+                    "avg_queries": round(agg["queries"] / agg["requests"], 2),
+                    "avg_db_time_ms": round(agg["db_time_ms"] / agg["requests"], 2),
+                }
+                for route, agg in self.routes.items()
+            }
+            slowest = [
+                {"duration_ms": round(ms, 2), "route": route, "statement": statement}
+                for ms, route, statement in sorted(self._slowest, reverse=True)
+            ]
+            return {
+                "routes": routes,
+                "background": {**self.background, "db_time_ms": round(self.background["db_time_ms"], 2)},
+                "slowest": slowest,
+                "n_plus_one": list(self.n_plus_one),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.routes.clear()
+            self.background = {"queries": 0, "db_time_ms": 0.0}
+            self._slowest.clear()
+            self.n_plus_one.clear()
+
+query_metrics = QueryMetrics()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000
+    statement = normalize_statement(statement)
+    stats = _current.get()
+    if stats is not None:
+        stats.add(statement, duration_ms)
+    query_metrics.record_statement(stats.route if stats is not None else None, statement, duration_ms)
+
+def instrument_engine(engine):
+    """Branche le comptage des requêtes sur un moteur synchrone (ou le sync_engine d'un moteur async)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+class QueryInstrumentationMiddleware:
+    """
+    Associe les requêtes SQL à la requête HTTP en cours (contextvar, propagée au threadpool).
+    En mode debug, ajoute X-DB-Queries, X-DB-Time-Ms et X-DB-Slowest-Ms à la réponse ;
+    dans tous les cas, agrège par route et signale les instructions répétées (N+1).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.db_instrumentation:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                if settings.debug:
+                    headers = MutableHeaders(raw=message["headers"])
+                    headers["X-DB-Queries"] = str(stats.count)
+                    headers["X-DB-Time-Ms"] = f"{stats.total_ms:.2f}"
+                    headers["X-DB-Slowest-Ms"] = f"{stats.slowest_ms:.2f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = stats.route
+            repeated = stats.repeated(settings.db_n_plus_one_threshold)
+            query_metrics.record_request(route, stats, repeated)
+            for statement, count in repeated:
+                n_plus_one_logger.warning(
+                    "⚠️  N+1 probable", extra={"route": route, "count": count, "statement": statement}
+                )
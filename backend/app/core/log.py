@@ -0,0 +1,133 @@
+# app/core/log.py
+import sys
+import json
+import time
+import queue
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional, Tuple
+from app.core.config import settings
+
+# Attributs standard d'un LogRecord : le reste provient de extra={...}
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[QueueHandler] = None
+_filters: List[Tuple[str, logging.Filter]] = []
+_setup_lock = threading.Lock()
+
+class JSONFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement, champs extra compris"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class TextFormatter(logging.Formatter):
+    """Format lisible, suivi des champs extra en clé=valeur"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s [%(name)s] %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = [f"{k}={v}" for k, v in vars(record).items() if k not in _RESERVED and not k.startswith("_")]
+        return f"{line} {' '.join(extras)}" if extras else line
+
+class RateLimitFilter(logging.Filter):
+    """
+    Seau à jetons par logger : au-delà de rate messages par seconde (rafale de burst),
+    les messages sont ignorés et leur nombre est signalé sur le message suivant accepté.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._suppressed = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                self._suppressed += 1
+                return False
+            self._tokens -= 1
+            suppressed, self._suppressed = self._suppressed, 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+class _EnqueueHandler(QueueHandler):
+    """Dépose l'enregistrement dans la file sans le formater : le thread d'écriture s'en charge"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Le message est résolu ici (les arguments peuvent changer ensuite), le formatage attend
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def setup_logging():
+    """
+    Configure le logger « app » : les enregistrements passent par une file en mémoire et sont
+    écrits sur la sortie standard par un thread dédié, jamais sur un thread de requête.
+    """
+    global _listener, _handler
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(JSONFormatter() if settings.log_format == "json" else TextFormatter())
+
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        _handler = _EnqueueHandler(records)
+        logger = logging.getLogger("app")
+        logger.setLevel(settings.log_level.upper())
+        logger.addHandler(_handler)
+        logger.propagate = False
+
+        for name, rate in settings.log_rate_limits.items():
+            rate_filter = RateLimitFilter(rate)
+            logging.getLogger(name).addFilter(rate_filter)
+            _filters.append((name, rate_filter))
+
+        _listener = QueueListener(records, output)
+        _listener.start()
+
+def stop_logging():
+    """Vide la file et arrête le thread d'écriture (à l'arrêt de l'application)"""
+    global _listener, _handler
+    with _setup_lock:
+        if _listener is None:
+            return
+        logger = logging.getLogger("app")
+        logger.removeHandler(_handler)
+        logger.propagate = True
+        for name, rate_filter in _filters:
+            logging.getLogger(name).removeFilter(rate_filter)
+        _filters.clear()
+        _listener.stop()
+        _listener, _handler = None, None
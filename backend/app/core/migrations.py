@@ -0,0 +1,122 @@
+# app/core/migrations.py
+import sys
+import logging
+import pkgutil
+import importlib
+from datetime import datetime
+from types import ModuleType
+from typing import List, Optional
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, select, text
+from sqlalchemy.engine import Connection, Engine
+import app.migrations
+
+# Nom explicite : __name__ vaut "__main__" avec python -m app.core.migrations
+logger = logging.getLogger("app.core.migrations")
+
+# Table de suivi : une ligne par migration appliquée (hors de Base, jamais créée par les modèles)
+schema_metadata = MetaData()
+schema_version = Table(
+    "schema_version", schema_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+# Verrou consultatif PostgreSQL : un seul worker applique les migrations
+MIGRATION_LOCK_ID = 0x5167_6E61
+
+def load_migrations() -> List[ModuleType]:
+    """
+    Migrations du paquet app.migrations (fichiers vNNNN_nom.py), triées par version.
+    Chaque module définit version, description et upgrade(connection).
+    """
+    migrations = []
+    for info in pkgutil.iter_modules(app.migrations.__path__):
+        if not info.name.startswith("v"):
+            continue
+        module = importlib.import_module(f"app.migrations.{info.name}")
+        migrations.append(module)
+    migrations.sort(key=lambda m: m.version)
+
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Versions de migration en double : {versions}")
+    return migrations
+
+def latest_version() -> int:
+    migrations = load_migrations()
+    return migrations[-1].version if migrations else 0
+
+def current_version(connection: Connection) -> int:
+    """Version du schéma en base (0 si la table de suivi n'existe pas encore)"""
+    if not connection.dialect.has_table(connection, schema_version.name):
+        return 0
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+def get_schema_status(engine: Engine) -> dict:
+    """Comparaison des versions seulement : une requête, aucune inspection du schéma"""
+    with engine.connect() as connection:
+        current = current_version(connection)
+    latest = latest_version()
+    return {"current": current, "latest": latest, "up_to_date": current >= latest}
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> List[int]:
+    """Applique les migrations en attente, chacune dans sa transaction ; retourne les versions appliquées"""
+    applied = []
+    with engine.connect() as connection:
+        is_postgres = connection.dialect.name == "postgresql"
+        if is_postgres:
+            connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+            connection.commit()
+        try:
+            with connection.begin():
+                schema_metadata.create_all(connection, checkfirst=True)
+
+            # Relue sous verrou : un autre worker a pu migrer entre-temps
+            current = current_version(connection)
+            connection.commit()
+            for migration in load_migrations():
+                if migration.version <= current or (target is not None and migration.version > target):
+                    continue
+                logger.info(
+                    f"📊 Migration {migration.version:04d} : {migration.description}",
+                    extra={"version": migration.version},
+                )
+                with connection.begin():
+                    migration.upgrade(connection)
+                    connection.execute(schema_version.insert().values(
+                        version=migration.version,
+                        description=migration.description,
+                        applied_at=datetime.utcnow(),
+                    ))
+                applied.append(migration.version)
+        finally:
+            if is_postgres:
+                connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                connection.commit()
+    return applied
+
+def main(argv: List[str]) -> int:
+    """python -m app.core.migrations [status|upgrade [version]]"""
+    from app.core.database import engine
+    from app.core.log import setup_logging, stop_logging
+
+    setup_logging()
+    try:
+        command = argv[0] if argv else "status"
+        if command == "status":
+            status = get_schema_status(engine)
+            logger.info("📊 Version du schéma", extra=status)
+            return 0 if status["up_to_date"] else 1
+        if command == "upgrade":
+            target = int(argv[1]) if len(argv) > 1 else None
+            applied = upgrade(engine, target)
+            logger.info("✅ Migrations appliquées", extra={"applied": applied})
+            return 0
+        logger.error(f"❌ Commande inconnue : {command} (status, upgrade)")
+        return 2
+    finally:
+        stop_logging()
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,84 @@
+# app/core/notifier.py
+import asyncio
+from typing import Dict, Optional, Set
+
+class Subscription:
+    """Abonnement d'une connexion (long-poll ou WebSocket) aux changements d'un device"""
+
+    def __init__(self, site: str, location: str):
+        self.site = site
+        self.location = location
+        self.event = asyncio.Event()
+        self.closed = False
+
+    def clear(self):
+        self.event.clear()
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Attend une notification. Retourne False si le délai expire."""
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def close(self):
+        self.closed = True
+        self.event.set()
+
+class DeviceNotifier:
+    """
+    Réveille les connexions en attente quand la configuration d'un device change.
+    Les abonnements sont indexés par site puis par location ; une connexion inactive
+    ne coûte qu'un asyncio.Event, sans tâche ni polling.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscriptions: Dict[str, Dict[str, Set[Subscription]]] = {}
+
+    def subscribe(self, site: str, location: str) -> Subscription:
+        """À appeler depuis la boucle asyncio"""
+        self._loop = asyncio.get_running_loop()
+        sub = Subscription(site, location)
+        self._subscriptions.setdefault(site, {}).setdefault(location, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        locations = self._subscriptions.get(sub.site)
+        if not locations:
+            return
+        subs = locations.get(sub.location)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del locations[sub.location]
+        if not locations:
+            del self._subscriptions[sub.site]
+
+    def notify(self, site: str, location: Optional[str] = None):
+        """
+        Signale un changement. Sans location, tous les devices du site sont réveillés.
+        Utilisable depuis n'importe quel thread (les services tournent dans le threadpool).
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._wake, site, location)
+
+    def _wake(self, site: str, location: Optional[str]):
+        locations = self._subscriptions.get(site)
+        if not locations:
+            return
+        if location is None:
+            targets = [sub for subs in locations.values() for sub in subs]
+        else:
+            targets = list(locations.get(location, ()))
+        for sub in targets:
+            sub.event.set()
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(subs) for locations in self._subscriptions.values() for subs in locations.values())
+
+notifier = DeviceNotifier()
@@ -0,0 +1,85 @@
+# app/core/pagination.py
+import json
+import base64
+from typing import Any, Iterable, List, Optional, Type
+from pydantic import BaseModel
+from app.core.config import settings
+from app.core.responses import FastJSONResponse, dump_trusted_list
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(last_id: int) -> str:
+    """Curseur opaque : position après la dernière ligne renvoyée"""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))["id"]
+    except Exception:
+        raise ValueError("Curseur invalide")
+    if not isinstance(last_id, int):
+        raise ValueError("Curseur invalide")
+    return last_id
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """Liste des colonnes demandées par fields=a,b,c ; l'id est toujours inclus (il sert de curseur)"""
+    if not fields:
+        return None
+    allowed = set(allowed)
+    requested = []
+    for field in fields.split(","):
+        field = field.strip()
+        if not field or field in requested:
+            continue
+        if field not in allowed:
+            raise ValueError(f"Champ inconnu : {field}")
+        requested.append(field)
+    if "id" not in requested:
+        requested.insert(0, "id")
+    return requested
+
+class PageRequest:
+    """
+    Pagination par clé (id > curseur, tri par id) et projection de colonnes.
+    Sans cursor, limit ni fields, la requête reste une liste complète (comportement historique).
+    """
+
+    def __init__(self, cursor: Optional[str], limit: Optional[int], fields: Optional[str], allowed: Iterable[str]):
+        self.after_id = decode_cursor(cursor) if cursor else None
+        self.paginated = cursor is not None or limit is not None
+        self.limit = min(limit or settings.api_page_default_limit, settings.api_page_max_limit) if self.paginated else None
+        self.fields = parse_fields(fields, allowed)
+
+    @property
+    def legacy(self) -> bool:
+        return not self.paginated and self.fields is None
+
+    def columns(self, model) -> List[Any]:
+        """Colonnes à sélectionner : l'entité complète, ou seulement les champs demandés"""
+        if self.fields is None:
+            return [model]
+        return [getattr(model, field) for field in self.fields]
+
+    def apply(self, query, model):
+        """Ajoute la condition de curseur, le tri et la limite (une ligne de plus pour savoir s'il y a une suite)"""
+        if self.after_id is not None:
+            query = query.filter(model.id > self.after_id)
+        query = query.order_by(model.id)
+        if self.limit is not None:
+            query = query.limit(self.limit + 1)
+        return query
+
+    def response(self, rows: List[Any], schema: Type[BaseModel]) -> FastJSONResponse:
+        """Sérialise la page ; le curseur suivant est renvoyé dans l'en-tête X-Next-Cursor"""
+        headers = {}
+        if self.limit is not None and len(rows) > self.limit:
+            rows = rows[:self.limit]
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].id)
+
+        if self.fields is None:
+            items = dump_trusted_list(rows, schema)
+        else:
+            items = [dict(row._mapping) for row in rows]
+        return FastJSONResponse(items, headers=headers)
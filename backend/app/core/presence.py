@@ -0,0 +1,74 @@
+# app/core/presence.py
+import heapq
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.device import Device
+
+def to_timestamp(value: Optional[datetime]) -> float:
+    """Convertit un datetime UTC naïf (format de la base) en timestamp"""
+    if value is None:
+        return 0.0
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+class PresenceTracker:
+    """
+    Suivi en mémoire du dernier heartbeat de chaque device en ligne.
+    Les échéances sont rangées dans un tas (heap) : détecter les devices expirés
+    coûte O(k log n) pour k expirations, quel que soit le nombre de devices.
+    """
+
+    def __init__(self, offline_after_seconds: int):
+        self.offline_after = offline_after_seconds
+        self._last_seen: Dict[int, float] = {}
+        # (échéance, device_id) ; les entrées périmées sont ignorées au dépilement
+        self._heap: List[Tuple[float, int]] = []
+
+    def touch(self, device_id: int, seen_at: float):
+        """Enregistre un signe de vie"""
+        self._last_seen[device_id] = seen_at
+        heapq.heappush(self._heap, (seen_at + self.offline_after, device_id))
+
+        # Compactage quand les entrées périmées dominent le tas
+        if len(self._heap) > 4 * len(self._last_seen) + 1024:
+            self._heap = [(last + self.offline_after, id) for id, last in self._last_seen.items()]
+            heapq.heapify(self._heap)
+
+    def forget(self, device_id: int):
+        self._last_seen.pop(device_id, None)
+
+    def expire(self, now: float) -> List[int]:
+        """Retire et retourne les devices dont l'échéance est dépassée"""
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            _, device_id = heapq.heappop(self._heap)
+            last_seen = self._last_seen.get(device_id)
+            if last_seen is None or last_seen + self.offline_after > now:
+                continue
+            del self._last_seen[device_id]
+            expired.append(device_id)
+        return expired
+
+    def __contains__(self, device_id: int) -> bool:
+        return device_id in self._last_seen
+
+    @property
+    def online_count(self) -> int:
+        return len(self._last_seen)
+
+    async def load(self):
+        """Reconstruit l'état à partir des devices marqués en ligne en base"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Device.id, Device.last_seen).where(Device.is_online == True)
+            )
+            rows = result.all()
+
+        # Les heartbeats déjà reçus depuis le démarrage sont plus récents que la base
+        for device_id, last_seen in rows:
+            if device_id not in self._last_seen:
+                self.touch(device_id, to_timestamp(last_seen))
+
+presence = PresenceTracker(settings.device_offline_after_seconds)
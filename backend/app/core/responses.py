@@ -0,0 +1,45 @@
+# app/core/responses.py
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Type
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel : repli sur json de la bibliothèque standard
+    orjson = None
+
+def _default(obj: Any) -> Any:
+    """Types non gérés nativement par l'encodeur"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Type non sérialisable : {type(obj).__name__}")
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """
+    Réponse JSON encodée directement (orjson si disponible), sans passer par jsonable_encoder.
+    À retourner telle quelle depuis l'endpoint pour éviter aussi la validation du response_model.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def dump_trusted_list(objs: Iterable[Any], schema: Type[BaseModel]) -> List[Dict[str, Any]]:
+    """
+    Lit les champs du schéma directement sur les objets ORM, sans validation Pydantic.
+    Réservé aux objets issus de notre base, dont la forme correspond déjà au schéma.
+    """
+    fields = tuple(schema.model_fields)
+    return [{field: getattr(obj, field) for field in fields} for obj in objs]
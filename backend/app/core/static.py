@@ -0,0 +1,126 @@
+# app/core/static.py
+import os
+import re
+import hashlib
+import mimetypes
+from typing import Dict, Optional
+from fastapi.exceptions import HTTPException
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Scope
+from app.core.compression import available_encodings, choose_encoding, compress, is_compressible
+from app.core.http_cache import etag_matches
+
+# Fichiers du build dont le nom contient un hash de contenu (ex. main.3f2a9c1b.js)
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.(?:chunk\.)?[a-z0-9]+$")
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+# Au-delà, les fichiers sont servis depuis le disque plutôt que gardés en mémoire
+MAX_MEMORY_ASSET_SIZE = 10 * 1024 * 1024
+# Extensions produites par une compression au moment du build
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+class StaticAsset:
+    """Fichier du frontend gardé en mémoire, avec ses variantes compressées"""
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str):
+        self.body = body
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.encoded: Dict[str, bytes] = {}
+
+    def response(self, scope: Scope) -> Response:
+        request_headers = Headers(scope=scope)
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control}
+        if self.encoded:
+            headers["Vary"] = "Accept-Encoding"
+        if etag_matches(request_headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+
+        body = self.body
+        # Pas de variante compressée (petit fichier) : corps d'origine
+        encoding = None
+        if self.encoded:
+            encoding = choose_encoding(request_headers.get("accept-encoding"), tuple(self.encoded))
+        if encoding is not None:
+            body = self.encoded[encoding]
+            headers["Content-Encoding"] = encoding
+        if scope["method"] == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(body, media_type=self.media_type, headers=headers)
+
+def cache_control_for(path: str) -> str:
+    return IMMUTABLE_CACHE if HASHED_NAME.search(os.path.basename(path)) else REVALIDATE_CACHE
+
+class SPAStaticFiles(StaticFiles):
+    """
+    Sert le build React : les fichiers textuels sont lus et compressés une seule fois au démarrage
+    (ou repris des .br/.gz générés au build), les bundles hashés sont marqués immuables,
+    et index.html est renvoyé depuis la mémoire pour les routes du frontend (React Router).
+    """
+
+    def __init__(self, directory: str):
+        super().__init__(directory=directory, html=True)
+        self.assets: Dict[str, StaticAsset] = {}
+        self._load_assets(directory)
+
+    def _load_assets(self, directory: str):
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith(tuple(PRECOMPRESSED_SUFFIXES.values())):
+                    continue
+                full_path = os.path.join(root, name)
+                media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                if not is_compressible(media_type) and name != "index.html":
+                    continue
+                if os.path.getsize(full_path) > MAX_MEMORY_ASSET_SIZE:
+                    continue
+
+                with open(full_path, "rb") as f:
+                    body = f.read()
+                rel_path = os.path.relpath(full_path, directory).replace(os.sep, "/")
+                if media_type.startswith("text/"):
+                    media_type += "; charset=utf-8"
+                asset = StaticAsset(body, media_type, cache_control_for(rel_path))
+
+                for encoding in available_encodings():
+                    precompressed = full_path + PRECOMPRESSED_SUFFIXES[encoding]
+                    if os.path.exists(precompressed):
+                        with open(precompressed, "rb") as f:
+                            asset.encoded[encoding] = f.read()
+                    elif len(body) >= 256:
+                        # Compression maximale : elle n'est faite qu'une fois
+                        asset.encoded[encoding] = compress(body, encoding, 11 if encoding == "br" else 9)
+                self.assets[rel_path] = asset
+
+    @property
+    def index(self) -> Optional[StaticAsset]:
+        return self.assets.get("index.html")
+
+    def index_response(self, scope: Scope) -> Response:
+        """index.html depuis la mémoire (fallback des routes React Router)"""
+        if self.index is None:
+            return Response('{"detail":"Frontend not available"}', status_code=404, media_type="application/json")
+        return self.index.response(scope)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        rel_path = path.replace(os.sep, "/").strip("/")
+        if rel_path in ("", "."):
+            rel_path = "index.html"
+        asset = self.assets.get(rel_path)
+        if asset is not None and scope["method"] in ("GET", "HEAD"):
+            return asset.response(scope)
+
+        try:
+            response = await super().get_response(path, scope)
+        except HTTPException as ex:
+            if ex.status_code == 404:
+                # Si le fichier n'existe pas, retourner index.html (pour React Router)
+                return self.index_response(scope)
+            raise ex
+        if response.status_code in (200, 304):
+            response.headers.setdefault("Cache-Control", cache_control_for(rel_path))
+        return response
@@ -7,24 +7,38 @@
 
 import os
 import asyncio
+import logging
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import JSONResponse
 from fastapi.exceptions import HTTPException
 
 # Imports de l'application
 from app.core.config import settings, print_config_summary
-from app.core.database import Base, engine
-from app.core.background import monitor_devices
+from app.core.log import setup_logging, stop_logging
+from app.core.database import engine
+from app.core.migrations import get_schema_status, upgrade as upgrade_schema
+from app.core.compression import CompressionMiddleware
+from app.core.instrumentation import QueryInstrumentationMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.core.static import SPAStaticFiles
+from app.core.background import monitor_devices, cleanup_upload_sessions
+from app.core.heartbeat import heartbeat_buffer
 from app.core.init_superadmin import create_default_superadmin
+from app.services.auth import PasswordHashBusy
 from app.api.routes import router as api_router
+from app.api.endpoints.monitoring import metrics_router
 
 # Import des modèles pour qu'ils soient reconnus par SQLAlchemy
 from app.models.site import Site
 from app.models.user import User
 from app.models.device import Device
 
+# Logs écrits par un thread dédié (avant tout message de démarrage)
+setup_logging()
+logger = logging.getLogger("app.main")
+
 # =============================================================================
 # CONFIGURATION DE L'APPLICATION FASTAPI
 # =============================================================================
@@ -48,8 +62,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Curseur de la page suivante des listes
 )
 
+# Nombre et durée des requêtes SQL par requête HTTP (et détection des N+1)
+app.add_middleware(QueryInstrumentationMiddleware)
+
+# Compteurs et histogrammes de durée par route, exposés par /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Compression brotli/gzip négociée des réponses JSON au-delà de compression_min_size
+app.add_middleware(CompressionMiddleware)
+
 # =============================================================================
 # ROUTES DE L'API (DOIT ÊTRE AVANT LES FICHIERS STATIQUES)
 # =============================================================================
@@ -58,51 +82,47 @@ app.add_middleware(
 # Exemple : GET /api/sites, POST /api/auth/login, etc.
 app.include_router(api_router, prefix="/api")
 
+# =============================================================================
+# ROUTE DE HEALTH CHECK ET MÉTRIQUES
+# =============================================================================
+
+# Déclarées avant le montage du frontend sur /, qui intercepterait sinon ces chemins
+
+@app.get("/health")
+async def health_check():
+    """Point de contrôle pour vérifier que l'API fonctionne"""
+    return {
+        "status": "healthy",
+        "service": "Digital Signage API",
+        "version": "1.0.0"
+    }
+
+# Métriques Prometheus
+app.include_router(metrics_router)
+
 # =============================================================================
 # CONFIGURATION DES ROUTES STATIQUES
 # =============================================================================
 
 # Servir les fichiers média uploadés (images, vidéos, etc.)
 # Les médias seront accessibles via /media/
-if os.path.exists("media"):
-    app.mount("/media", StaticFiles(directory="media"), name="media")
-    print("✅ Dossier média monté sur /media")
+if os.path.exists(settings.media_root):
+    app.mount("/media", StaticFiles(directory=settings.media_root), name="media")
+    logger.info("✅ Dossier média monté sur /media")
 
 # =============================================================================
 # GESTION SPA (SINGLE PAGE APPLICATION) - REACT ROUTER
 # =============================================================================
 
-# Custom StaticFiles pour gérer le fallback HTML5 History API
-class SPAStaticFiles(StaticFiles):
-    async def get_response(self, path: str, scope):
-        try:
-            return await super().get_response(path, scope)
-        except HTTPException as ex:
-            if ex.status_code == 404:
-                # Si le fichier n'existe pas, retourner index.html (pour React Router)
-                return await super().get_response("index.html", scope)
-            else:
-                raise ex
-
 # Servir le frontend React avec support SPA
+# Les fichiers sont chargés et compressés une fois ici, index.html reste en mémoire
+frontend = None
 if os.path.exists("static"):
-    app.mount("/", SPAStaticFiles(directory="static", html=True), name="frontend")
-    print("✅ Frontend React monté avec support SPA")
+    frontend = SPAStaticFiles(directory="static")
+    app.mount("/", frontend, name="frontend")
+    logger.info("✅ Frontend React monté avec support SPA")
 else:
-    print("⚠️  Dossier 'static' non trouvé - Frontend non disponible")
-
-# =============================================================================
-# ROUTE DE HEALTH CHECK
-# =============================================================================
-
-@app.get("/health")
-async def health_check():
-    """Point de contrôle pour vérifier que l'API fonctionne"""
-    return {
-        "status": "healthy",
-        "service": "Digital Signage API",
-        "version": "1.0.0"
-    }
+    logger.warning("⚠️  Dossier 'static' non trouvé - Frontend non disponible")
 
 # =============================================================================
 # GESTION DES ERREURS 404 POUR LES ROUTES NON-API
@@ -115,13 +135,22 @@ async def custom_404_handler(request: Request, exc: HTTPException):
     
     # Si c'est une route API, retourner l'erreur JSON normale
     if path.startswith("/api/"):
-        return {"detail": "Not Found"}
+        return JSONResponse({"detail": getattr(exc, "detail", "Not Found")}, status_code=404)
     
-    # Pour toutes les autres routes, servir index.html (React Router)
-    if os.path.exists("static/index.html"):
-        return FileResponse("static/index.html")
+    # Pour toutes les autres routes, servir index.html depuis la mémoire (React Router)
+    if frontend is not None and frontend.index is not None:
+        return frontend.index_response(request.scope)
     else:
-        return {"detail": "Frontend not available"}
+        return JSONResponse({"detail": "Frontend not available"}, status_code=404)
+
+@app.exception_handler(PasswordHashBusy)
+async def password_hash_busy_handler(request: Request, exc: PasswordHashBusy):
+    """File de hash des mots de passe pleine : refus immédiat plutôt qu'attente"""
+    return JSONResponse(
+        {"detail": "Trop de tentatives de connexion simultanées, réessayez plus tard"},
+        status_code=429,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 # =============================================================================
 # ÉVÉNEMENTS DE CYCLE DE VIE DE L'APPLICATION
@@ -130,43 +159,78 @@ async def custom_404_handler(request: Request, exc: HTTPException):
 @app.on_event("startup")
 async def startup_event():
     """Actions à effectuer au démarrage de l'application"""
-    print("🚀 Démarrage de Digital Signage API...")
+    setup_logging()
+    logger.info("🚀 Démarrage de Digital Signage API...")
     
     # Afficher la configuration
     print_config_summary()
     
-    # Créer toutes les tables de base de données
-    print("📊 Création des tables de base de données...")
+    # Schéma de base de données : seule la version est comparée, les migrations en attente sont appliquées.
+    # Une erreur arrête le démarrage : l'API ne doit pas servir un schéma en retard.
+    logger.info("📊 Vérification de la version du schéma...")
     try:
-        Base.metadata.create_all(bind=engine)
-        print("✅ Tables créées avec succès")
-    except Exception as e:
-        print(f"❌ Erreur lors de la création des tables : {e}")
+        status = get_schema_status(engine)
+        if status["up_to_date"]:
+            logger.info("✅ Schéma à jour", extra={"version": status["current"]})
+        elif settings.db_auto_migrate:
+            applied = upgrade_schema(engine)
+            logger.info("✅ Migrations appliquées", extra={"applied": applied})
+        else:
+            raise RuntimeError(
+                f"Schéma en version {status['current']}, version {status['latest']} attendue : "
+                "lancer python -m app.core.migrations upgrade"
+            )
+    except Exception:
+        logger.exception("❌ Erreur lors de la migration du schéma")
+        raise
     
     # Créer le superadmin par défaut s'il n'existe pas
-    print("👤 Vérification du superadmin par défaut...")
+    logger.info("👤 Vérification du superadmin par défaut...")
     try:
         create_default_superadmin()
-        print("✅ Superadmin configuré")
-    except Exception as e:
-        print(f"❌ Erreur lors de la création du superadmin : {e}")
+        logger.info("✅ Superadmin configuré")
+    except Exception:
+        logger.exception("❌ Erreur lors de la création du superadmin")
     
     # Lancer le monitoring des devices en arrière-plan
-    print("📡 Démarrage du monitoring des devices...")
+    logger.info("📡 Démarrage du monitoring des devices...")
     try:
         asyncio.create_task(monitor_devices())
-        print("✅ Monitoring des devices démarré")
-    except Exception as e:
-        print(f"❌ Erreur lors du démarrage du monitoring : {e}")
+        logger.info("✅ Monitoring des devices démarré")
+    except Exception:
+        logger.exception("❌ Erreur lors du démarrage du monitoring")
     
-    print("🎉 Digital Signage API démarré avec succès !")
-    print(f"📋 Documentation API : https://signage.pntserv.fr/api/docs")
+    # Nettoyage des sessions d'upload abandonnées
+    try:
+        asyncio.create_task(cleanup_upload_sessions())
+    except Exception:
+        logger.exception("❌ Erreur lors du démarrage du nettoyage des uploads")
+    
+    # Lancer l'écriture groupée des heartbeats
+    logger.info("💓 Démarrage du tampon des heartbeats...")
+    try:
+        heartbeat_buffer.start()
+        logger.info("✅ Tampon des heartbeats démarré")
+    except Exception:
+        logger.exception("❌ Erreur lors du démarrage du tampon des heartbeats")
+    
+    logger.info("🎉 Digital Signage API démarré avec succès !")
+    logger.info(f"📋 Documentation API : https://signage.pntserv.fr/api/docs")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Actions à effectuer à l'arrêt de l'application"""
-    print("🛑 Arrêt de Digital Signage API...")
-    print("✅ Application arrêtée proprement")
+    logger.info("🛑 Arrêt de Digital Signage API...")
+    
+    # Écrire les heartbeats encore en attente
+    try:
+        await heartbeat_buffer.stop()
+        logger.info("✅ Heartbeats en attente écrits")
+    except Exception:
+        logger.exception("❌ Erreur lors de l'écriture des heartbeats")
+    
+    logger.info("✅ Application arrêtée proprement")
+    stop_logging()
 
 # =============================================================================
 # POINTS D'ACCÈS DE L'APPLICATION
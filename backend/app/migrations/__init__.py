@@ -0,0 +1,6 @@
+# app/migrations/__init__.py
+# Migrations du schéma, appliquées dans l'ordre par app.core.migrations.
+# Chaque fichier vNNNN_nom.py définit :
+#   version      numéro croissant (NNNN)
+#   description  résumé enregistré dans la table schema_version
+#   upgrade(connection)  exécuté dans une transaction
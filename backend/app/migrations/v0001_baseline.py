@@ -0,0 +1,49 @@
+# app/migrations/v0001_baseline.py
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, JSON, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+version = 1
+description = "Schéma initial (sites, users, devices)"
+
+# Schéma figé à la version 1 : indépendant de app.models, que les migrations suivantes font évoluer
+metadata = MetaData()
+
+sites = Table(
+    "sites", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, unique=True, nullable=False),
+    Column("address", String, nullable=False),
+)
+
+users = Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("email", String, unique=True, nullable=False),
+    Column("hashed_password", String, nullable=False),
+    Column("role", String, nullable=False),
+    Column("site_id", Integer, ForeignKey("sites.id"), nullable=True),
+)
+
+devices = Table(
+    "devices", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("site_id", Integer, ForeignKey("sites.id"), nullable=False),
+    Column("location", String, nullable=False),
+    Column("name", String, unique=True, nullable=False),
+    Column("last_seen", DateTime),
+    Column("is_online", Boolean),
+    Column("is_playing", Boolean),
+    Column("current_media", String, nullable=True),
+    Column("ip_address", String, nullable=True),
+    Column("mac_address", String, nullable=True),
+    Column("system_info", JSON, nullable=True),
+    Column("enabled", Boolean),
+    Column("volume", Integer),
+    Column("screen_on", Boolean),
+    Column("schedule", JSON, nullable=True),
+    Column("pending_actions", JSON, nullable=True),
+)
+
+def upgrade(connection: Connection):
+    # checkfirst : les bases créées avant les migrations (create_all au démarrage) sont reprises telles quelles
+    metadata.create_all(connection, checkfirst=True)
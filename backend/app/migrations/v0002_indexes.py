@@ -0,0 +1,38 @@
+# app/migrations/v0002_indexes.py
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, MetaData, Table
+from sqlalchemy.engine import Connection
+
+version = 2
+description = "Index secondaires : listes par site, suivi de présence, devices en ligne"
+
+# Colonnes indexées, figées à cette version (les index sont aussi déclarés sur les modèles)
+metadata = MetaData()
+
+devices = Table(
+    "devices", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("site_id", Integer),
+    Column("last_seen", DateTime),
+    Column("is_online", Boolean),
+)
+
+users = Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("site_id", Integer),
+)
+
+INDEXES = [
+    Index("ix_devices_site_id_id", devices.c.site_id, devices.c.id),
+    Index("ix_devices_is_online_last_seen", devices.c.is_online, devices.c.last_seen),
+    Index(
+        "ix_devices_online_last_seen", devices.c.last_seen,
+        postgresql_where=devices.c.is_online == True,
+        sqlite_where=devices.c.is_online == True,
+    ),
+    Index("ix_users_site_id_id", users.c.site_id, users.c.id),
+]
+
+def upgrade(connection: Connection):
+    for index in INDEXES:
+        index.create(connection)
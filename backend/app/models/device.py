@@ -1,5 +1,5 @@
 # app/models/device.py
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base  # Même Base que les autres
@@ -32,4 +32,18 @@ class Device(Base):
     # Actions en attente
     pending_actions = Column(JSON, nullable=True)  # {"reboot": true, "update": true, etc.}
     
-    site = relationship("Site")
\ No newline at end of file
+    site = relationship("Site")
+
+    # Plan d'index (créés par la migration 0002, voir app/migrations)
+    __table_args__ = (
+        # Listes et statistiques filtrées par site, paginées par id
+        Index("ix_devices_site_id_id", "site_id", "id"),
+        # Recherche des devices en ligne dont le dernier heartbeat est trop ancien
+        Index("ix_devices_is_online_last_seen", "is_online", "last_seen"),
+        # Index partiel : seuls les devices en ligne, relus au démarrage par le suivi de présence
+        Index(
+            "ix_devices_online_last_seen", "last_seen",
+            postgresql_where=is_online == True,
+            sqlite_where=is_online == True,
+        ),
+    )
@@ -1,5 +1,5 @@
 # app/models/user.py
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base  # Même Base que site.py
 
@@ -12,4 +12,9 @@ class User(Base):
     role = Column(String, nullable=False, default="admin")  # admin, superadmin
     site_id = Column(Integer, ForeignKey("sites.id"), nullable=True)
 
-    site = relationship("Site")
\ No newline at end of file
+    site = relationship("Site")
+
+    # Liste des utilisateurs d'un site, paginée par id (créé par la migration 0002)
+    __table_args__ = (
+        Index("ix_users_site_id_id", "site_id", "id"),
+    )
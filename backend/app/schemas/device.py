@@ -34,6 +34,22 @@ class DeviceAction(BaseModel):
     action: str
     params: Optional[Dict[str, Any]] = None
 
+class DeviceSnapshot(BaseModel):
+    """Vue immuable d'un device, mise en cache pour les endpoints appelés par les devices"""
+    id: int
+    site_id: int
+    location: str
+    name: str
+    enabled: bool = True
+    volume: int = 50
+    screen_on: bool = True
+    schedule: Optional[Dict[str, Any]] = None
+    pending_actions: Optional[Dict[str, Any]] = None
+    
+    class Config:
+        from_attributes = True
+        frozen = True
+
 class DeviceRead(DeviceBase):
     id: int
     last_seen: Optional[datetime] = None
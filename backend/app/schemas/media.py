@@ -1,10 +1,24 @@
 # app/schemas/media.py
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class MediaFile(BaseModel):
     filename: str
     site_name: str
 
 class MediaList(BaseModel):
-    files: List[MediaFile]
\ No newline at end of file
+    files: List[MediaFile]
+
+class UploadSessionCreate(BaseModel):
+    site_name: str
+    filename: str
+    size: Optional[int] = None
+    replace: bool = False
+
+class UploadSessionRead(BaseModel):
+    id: str
+    site_name: str
+    filename: str
+    size: Optional[int] = None
+    replace: bool = False
+    offset: int
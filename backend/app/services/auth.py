@@ -1,20 +1,145 @@
 # app/services/auth.py
+import math
+import time
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Un hash dont le coût diffère de bcrypt_rounds est signalé par verify_and_update
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+
+# Tokens déjà vérifiés -> utilisateur authentifié (UserRead), pour éviter une requête par appel
+token_cache = TTLCache("tokens", settings.token_cache_max_entries, settings.token_cache_ttl_seconds)
+
+def invalidate_user_tokens(user_id: int):
+    """Oublie les tokens en cache d'un utilisateur (rôle, mot de passe modifiés ou suppression)"""
+    token_cache.invalidate_where(lambda token, principal: principal.id == user_id)
+
+class PasswordHashBusy(Exception):
+    """Trop de calculs de hash en attente : la requête doit être retentée plus tard"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing saturated")
+        self.retry_after = retry_after
+
+class PasswordHasher:
+    """
+    Exécute bcrypt sur un pool de threads dédié et borné, pour qu'un pic de connexions
+    n'occupe pas le threadpool partagé par les autres endpoints.
+    Au-delà de workers + queue_size calculs en cours, les demandes sont refusées immédiatement.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.limit = workers + queue_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.total_wait_seconds = 0.0
+
+    def _admit(self):
+        with self._lock:
+            if self.in_flight >= self.limit:
+                self.rejected += 1
+                raise PasswordHashBusy(self._retry_after())
+            self.in_flight += 1
+
+    def _retry_after(self) -> int:
+        """Délai estimé pour écouler la file (appelé sous _lock)"""
+        average = self.total_seconds / self.completed if self.completed else 0.25
+        return max(1, math.ceil(average * self.in_flight / self.workers))
+
+    def _timed(self, queued_at: float, func, *args):
+        started = time.perf_counter()
+        with self._lock:
+            self.running += 1
+            self.total_wait_seconds += started - queued_at
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.running -= 1
+                self.in_flight -= 1
+                self.completed += 1
+                self.total_seconds += elapsed
+                self.max_seconds = max(self.max_seconds, elapsed)
+
+    def submit(self, func, *args) -> Future:
+        """Soumet un calcul ; lève PasswordHashBusy si la file est pleine"""
+        self._admit()
+        try:
+            return self._executor.submit(self._timed, time.perf_counter(), func, *args)
+        except BaseException:
+            with self._lock:
+                self.in_flight -= 1
+            raise
+
+    async def run_async(self, func, *args):
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def record_rehash(self):
+        with self._lock:
+            self.rehashed += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = self.completed
+            return {
+                "workers": self.workers,
+                "queue_limit": self.limit,
+                "in_flight": self.in_flight,
+                "queued": self.in_flight - self.running,
+                "completed": completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "avg_hash_ms": round(self.total_seconds / completed * 1000, 2) if completed else 0.0,
+                "max_hash_ms": round(self.max_seconds * 1000, 2),
+                "avg_wait_ms": round(self.total_wait_seconds / completed * 1000, 2) if completed else 0.0,
+            }
+
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_queue_size)
+
+# Versions synchrones : calcul direct sur le thread appelant, sans passer par le pool borné.
+# Réservées au code hors requêtes (création du superadmin au démarrage, scripts) ;
+# les endpoints utilisent les variantes *_async.
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Vérifie un mot de passe"""
+    """Vérifie un mot de passe (usage hors ligne)"""
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Hash un mot de passe"""
+    """Hash un mot de passe (usage hors ligne)"""
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Vérifie un mot de passe sans bloquer la boucle.
+    Retourne aussi le nouveau hash à enregistrer si le coût configuré a changé.
+    """
+    valid, new_hash = await password_hasher.run_async(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+    if valid and new_hash:
+        password_hasher.record_rehash()
+    return valid, new_hash
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash un mot de passe sans bloquer la boucle"""
+    return await password_hasher.run_async(pwd_context.hash, password)
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Crée un token JWT"""
     to_encode = data.copy()
@@ -0,0 +1,97 @@
+# app/services/bundle.py
+import os
+import json
+import tarfile
+import hashlib
+from typing import AsyncIterator, List, Tuple, Union
+import anyio
+from app.services.sync import MEDIA_ROOT, read_playlist
+
+BLOCK_SIZE = tarfile.BLOCKSIZE
+READ_SIZE = 1024 * 1024
+
+# Un segment est soit des octets (en-têtes tar, bourrage), soit un fichier (chemin, taille)
+Segment = Union[bytes, Tuple[str, int]]
+
+def _padding(size: int) -> bytes:
+    remainder = size % BLOCK_SIZE
+    return b"\0" * (BLOCK_SIZE - remainder) if remainder else b""
+
+def plan_bundle(site: str, location: str) -> Tuple[List[Segment], int, str]:
+    """
+    Prépare l'archive tar de la playlist d'un device sans l'écrire : liste des segments,
+    taille totale et ETag. La disposition étant déterministe, l'archive peut être
+    reprise à n'importe quel offset.
+    """
+    media_path = os.path.join(MEDIA_ROOT, site, location)
+    names = ["playlist.txt"] + read_playlist(site, location)
+
+    segments: List[Segment] = []
+    version = []
+    total = 0
+    for name in names:
+        file_path = os.path.join(media_path, name)
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            continue
+
+        info = tarfile.TarInfo(name=name)
+        info.size = st.st_size
+        info.mtime = int(st.st_mtime)
+        info.mode = 0o644
+        header = info.tobuf(format=tarfile.GNU_FORMAT)
+
+        segments.append(header)
+        segments.append((file_path, st.st_size))
+        padding = _padding(st.st_size)
+        if padding:
+            segments.append(padding)
+        total += len(header) + st.st_size + len(padding)
+        version.append([name, st.st_ino, st.st_size, st.st_mtime_ns])
+
+    # Fin d'archive : deux blocs vides
+    trailer = b"\0" * (2 * BLOCK_SIZE)
+    segments.append(trailer)
+    total += len(trailer)
+
+    etag = '"' + hashlib.sha1(json.dumps(version).encode("utf-8")).hexdigest() + '"'
+    return segments, total, etag
+
+async def _read_file(path: str, size: int, start: int, end: int) -> AsyncIterator[bytes]:
+    """Octets [start, end) d'un fichier de taille annoncée size (complété par des zéros s'il a rétréci)"""
+    position = start
+    try:
+        async with await anyio.open_file(path, "rb") as f:
+            await f.seek(start)
+            while position < end:
+                chunk = await f.read(min(READ_SIZE, end - position))
+                if not chunk:
+                    break
+                position += len(chunk)
+                yield chunk
+    except FileNotFoundError:
+        pass
+    if position < end:
+        yield b"\0" * (end - position)
+
+async def iter_bundle(segments: List[Segment], start: int, end: int) -> AsyncIterator[bytes]:
+    """Produit les octets [start, end] (inclus) de l'archive"""
+    offset = 0
+    stop = end + 1
+    for segment in segments:
+        length = len(segment) if isinstance(segment, bytes) else segment[1]
+        seg_start, seg_end = offset, offset + length
+        offset = seg_end
+        if seg_end <= start:
+            continue
+        if seg_start >= stop:
+            break
+
+        lo = max(start, seg_start) - seg_start
+        hi = min(stop, seg_end) - seg_start
+        if isinstance(segment, bytes):
+            yield segment[lo:hi]
+        else:
+            async for chunk in _read_file(segment[0], segment[1], lo, hi):
+                yield chunk
@@ -1,10 +1,40 @@
 # app/services/device.py
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.cache import TTLCache, MISSING
+from app.core.config import settings
+from app.core.database import engine
+from app.core.notifier import notifier
+from app.core.pagination import PageRequest
 from app.models.device import Device
-from app.schemas.device import DeviceCreate, DeviceUpdate, DeviceStatus
+from app.schemas.device import DeviceCreate, DeviceUpdate, DeviceStatus, DeviceSnapshot
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
+# Cache des devices par nom pour les endpoints appelés par les devices (sync, heartbeat, download)
+device_cache = TTLCache("devices", settings.entity_cache_max_entries, settings.entity_cache_ttl_seconds)
+
+# Snapshots lus sur la réplique (DATABASE_READ_URL) : cache séparé, pour qu'une ligne en retard
+# de réplication ne soit jamais servie aux endpoints lus sur la base principale (heartbeat,
+# manifest, download et leur contrôle de enabled)
+replica_device_cache = TTLCache("devices_replica", settings.entity_cache_max_entries, settings.entity_cache_ttl_seconds)
+
+# Statistiques agrégées du tableau de bord (courte durée : les heartbeats les font évoluer)
+stats_cache = TTLCache("device_stats", 1024, settings.device_stats_cache_ttl_seconds)
+
+def invalidate_device_cache(name: str):
+    device_cache.pop(name)
+    replica_device_cache.pop(name)
+
+def _snapshot_cache(db: Session) -> TTLCache:
+    return device_cache if db.get_bind() is engine else replica_device_cache
+
+def notify_device_change(device: Device):
+    """Réveille les connexions push du device après un commit"""
+    if device.site is not None:
+        notifier.notify(device.site.name, device.location)
+
 def create_device(db: Session, device: DeviceCreate) -> Device:
     """Créer un nouveau device"""
     db_device = Device(
@@ -18,6 +48,8 @@ def create_device(db: Session, device: DeviceCreate) -> Device:
     db.add(db_device)
     db.commit()
     db.refresh(db_device)
+    invalidate_device_cache(db_device.name)
+    stats_cache.clear()
     return db_device
 
 def get_device_by_id(db: Session, device_id: int) -> Optional[Device]:
@@ -28,6 +60,43 @@ def get_device_by_name(db: Session, name: str) -> Optional[Device]:
     """Récupérer un device par son nom"""
     return db.query(Device).filter(Device.name == name).first()
 
+async def get_device_by_name_async(db: AsyncSession, name: str) -> Optional[Device]:
+    """Récupérer un device par son nom (session asynchrone)"""
+    result = await db.execute(select(Device).where(Device.name == name))
+    return result.scalars().first()
+
+def get_device_snapshot_by_name(db: Session, name: str) -> Optional[DeviceSnapshot]:
+    """
+    Récupérer un device par son nom, via le cache (lecture en base seulement en cas d'absence).
+    Une session sur la réplique utilise son propre cache, jamais celui de la base principale.
+    """
+    cache = _snapshot_cache(db)
+    snapshot = cache.get(name)
+    if snapshot is not MISSING:
+        return snapshot
+    
+    generation = cache.generation
+    device = get_device_by_name(db, name)
+    if not device:
+        return None
+    snapshot = DeviceSnapshot.model_validate(device)
+    cache.set(name, snapshot, generation=generation)
+    return snapshot
+
+async def get_device_snapshot_by_name_async(db: AsyncSession, name: str) -> Optional[DeviceSnapshot]:
+    """Récupérer un device par son nom, via le cache (session asynchrone)"""
+    snapshot = device_cache.get(name)
+    if snapshot is not MISSING:
+        return snapshot
+    
+    generation = device_cache.generation
+    device = await get_device_by_name_async(db, name)
+    if not device:
+        return None
+    snapshot = DeviceSnapshot.model_validate(device)
+    device_cache.set(name, snapshot, generation=generation)
+    return snapshot
+
 def get_devices_by_site(db: Session, site_id: int) -> List[Device]:
     """Récupérer tous les devices d'un site"""
     return db.query(Device).filter(Device.site_id == site_id).all()
@@ -36,22 +105,55 @@ def get_all_devices(db: Session) -> List[Device]:
     """Récupérer tous les devices"""
     return db.query(Device).all()
 
+def list_devices_page(
+    db: Session,
+    page: PageRequest,
+    site_id: Optional[int] = None,
+    online: Optional[bool] = None,
+    playing: Optional[bool] = None,
+    name_prefix: Optional[str] = None
+) -> List[Any]:
+    """Page de devices filtrée côté base (entités complètes ou colonnes demandées)"""
+    query = db.query(*page.columns(Device))
+    if site_id:
+        query = query.filter(Device.site_id == site_id)
+    if online is not None:
+        query = query.filter(Device.is_online == online)
+    if playing is not None:
+        query = query.filter(Device.is_playing == playing)
+    if name_prefix:
+        query = query.filter(Device.name.startswith(name_prefix, autoescape=True))
+    return page.apply(query, Device).all()
+
 def update_device(db: Session, device_id: int, device_update: DeviceUpdate) -> Optional[Device]:
     """Mettre à jour un device"""
     device = get_device_by_id(db, device_id)
     if not device:
         return None
     
+    # Le site ou la location peuvent changer : on prévient aussi l'ancienne adresse
+    previous_site, previous_location = device.site, device.location
+    
     update_data = device_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(device, field, value)
     
     db.commit()
     db.refresh(device)
+    invalidate_device_cache(device.name)
+    stats_cache.clear()
+    
+    if previous_site is not None:
+        notifier.notify(previous_site.name, previous_location)
+    notify_device_change(device)
     return device
 
 def update_device_status(db: Session, device: Device, status: DeviceStatus):
     """Mettre à jour le statut d'un device"""
+    _apply_device_status(device, status)
+    db.commit()
+
+def _apply_device_status(device: Device, status: DeviceStatus):
     device.is_online = status.is_online
     device.is_playing = status.is_playing
     device.current_media = status.current_media
@@ -63,8 +165,11 @@ def update_device_status(db: Session, device: Device, status: DeviceStatus):
         device.mac_address = status.mac_address
     if status.system_info:
         device.system_info = status.system_info
-    
-    db.commit()
+
+async def update_device_status_async(db: AsyncSession, device: Device, status: DeviceStatus):
+    """Mettre à jour le statut d'un device (session asynchrone)"""
+    _apply_device_status(device, status)
+    await db.commit()
 
 def set_device_action(db: Session, device_id: int, action: str, params: Optional[Dict[str, Any]] = None) -> Optional[Device]:
     """Définir une action à exécuter sur un device"""
@@ -72,25 +177,70 @@ def set_device_action(db: Session, device_id: int, action: str, params: Optional
     if not device:
         return None
     
-    if not device.pending_actions:
-        device.pending_actions = {}
-    
-    device.pending_actions[action] = params or True
+    # Nouveau dict : une mutation en place de la colonne JSON n'est pas détectée par SQLAlchemy
+    pending_actions = dict(device.pending_actions or {})
+    pending_actions[action] = params or True
+    device.pending_actions = pending_actions
     db.commit()
     db.refresh(device)
+    invalidate_device_cache(device.name)
+    
+    notify_device_change(device)
     return device
 
-def get_device_statistics(db: Session, site_id: Optional[int] = None) -> Dict[str, int]:
-    """Récupérer les statistiques des devices"""
-    query = db.query(Device)
-    if site_id:
-        query = query.filter(Device.site_id == site_id)
+def delete_device(db: Session, device_id: int) -> bool:
+    """Supprimer un device"""
+    device = get_device_by_id(db, device_id)
+    if not device:
+        return False
     
-    devices = query.all()
+    site = device.site
+    location = device.location
+    db.delete(device)
+    db.commit()
+    invalidate_device_cache(device.name)
+    stats_cache.clear()
     
-    return {
-        "total": len(devices),
-        "online": len([d for d in devices if d.is_online]),
-        "offline": len([d for d in devices if not d.is_online]),
-        "playing": len([d for d in devices if d.is_playing])
-    }
\ No newline at end of file
+    if site is not None:
+        notifier.notify(site.name, location)
+    return True
+
+def _empty_statistics() -> Dict[str, int]:
+    return {"total": 0, "online": 0, "offline": 0, "playing": 0}
+
+def get_device_statistics(db: Session, site_id: Optional[int] = None, by_site: bool = False) -> Dict[str, Any]:
+    """
+    Récupérer les statistiques des devices en une seule requête agrégée (COUNT / SUM par site),
+    sans charger les lignes. Avec by_site, ajoute le détail par site.
+    """
+    key = (site_id, by_site)
+    if settings.device_stats_cache_ttl_seconds > 0:
+        cached = stats_cache.get(key)
+        if cached is not MISSING:
+            return cached
+    generation = stats_cache.generation
+
+    query = db.query(
+        Device.site_id,
+        func.count(Device.id),
+        func.sum(case((Device.is_online == True, 1), else_=0)),
+        func.sum(case((Device.is_playing == True, 1), else_=0)),
+    )
+    if site_id:
+        query = query.filter(Device.site_id == site_id)
+
+    stats = _empty_statistics()
+    sites = []
+    for row_site_id, total, online, playing in query.group_by(Device.site_id).order_by(Device.site_id):
+        online, playing = int(online or 0), int(playing or 0)
+        site_stats = {"total": total, "online": online, "offline": total - online, "playing": playing}
+        for field, value in site_stats.items():
+            stats[field] += value
+        if by_site:
+            sites.append({"site_id": row_site_id, **site_stats})
+
+    if by_site:
+        stats["sites"] = sites
+    if settings.device_stats_cache_ttl_seconds > 0:
+        stats_cache.set(key, stats, generation=generation)
+    return stats
@@ -1,42 +1,240 @@
 # app/services/media.py
 import os
-import shutil
+import uuid
+import hashlib
+import threading
 from fastapi import UploadFile
-from typing import List
+from typing import BinaryIO, List, Optional, Tuple, Dict, Any
+from app.core.config import settings
 
-MEDIA_ROOT = "/app/media"
+MEDIA_ROOT = settings.media_root
 
-def save_file(file: UploadFile, site_name: str, replace: bool = False) -> str:
-    """Sauvegarder un fichier média"""
+# Stockage adressé par contenu : chaque fichier unique est stocké une fois sous
+# .blobs/<sha256>, les noms par site sont des liens physiques (hardlinks) vers ce blob.
+# Le nombre de liens de l'inode sert de compteur de références.
+BLOB_ROOT = os.path.join(MEDIA_ROOT, ".blobs")
+TMP_ROOT = os.path.join(MEDIA_ROOT, ".tmp")
+CHUNK_SIZE = 1024 * 1024
+
+# Cache des empreintes par inode : (st_dev, st_ino) -> (taille, mtime_ns, sha256).
+# Les liens physiques d'un même blob partagent donc une seule entrée.
+_digest_cache: Dict[Tuple[int, int], Tuple[int, int, str]] = {}
+_digest_lock = threading.Lock()
+
+class FileTooLargeError(Exception):
+    """Le fichier dépasse la taille maximale autorisée"""
+
+def _temp_path() -> str:
+    os.makedirs(TMP_ROOT, exist_ok=True)
+    return os.path.join(TMP_ROOT, uuid.uuid4().hex)
+
+def _write_temp(source: BinaryIO, max_size: Optional[int] = None) -> Tuple[str, str, int]:
+    """Copie le flux par blocs dans un fichier temporaire en calculant taille et SHA-256"""
+    tmp_path = _temp_path()
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, "wb") as buffer:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise FileTooLargeError(f"File exceeds {max_size} bytes")
+                digest.update(chunk)
+                buffer.write(chunk)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest(), size
+
+def _store_blob(tmp_path: str, digest: str) -> str:
+    """Range le fichier temporaire dans le store ; si le contenu existe déjà, il est abandonné"""
+    os.makedirs(BLOB_ROOT, exist_ok=True)
+    blob_path = os.path.join(BLOB_ROOT, digest)
+    try:
+        os.link(tmp_path, blob_path)
+    except FileExistsError:
+        pass
+    os.remove(tmp_path)
+    _remember_digest(os.stat(blob_path), digest)
+    return blob_path
+
+def _publish(blob_path: str, file_path: str, replace: bool = True):
+    """Crée (ou remplace) atomiquement le nom du site pointant vers le blob"""
+    if not replace:
+        # os.link échoue si le nom existe déjà : pas d'écrasement même en cas d'upload concurrent
+        try:
+            os.link(blob_path, file_path)
+        except FileExistsError:
+            blob_st = _stat(blob_path)
+            if blob_st and blob_st.st_nlink == 1:
+                os.remove(blob_path)
+            raise
+        return
+
+    previous = _stat(file_path)
+    blob_ino = os.stat(blob_path).st_ino
+    if previous and previous.st_ino == blob_ino:
+        # Le nom pointe déjà vers ce contenu (même fichier renvoyé)
+        return
+
+    tmp_link = _temp_path()
+    os.link(blob_path, tmp_link)
+    os.replace(tmp_link, file_path)
+    # rename() ne fait rien si les deux noms désignent déjà le même inode (publication concurrente)
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+
+    if previous and previous.st_ino != blob_ino:
+        _release_blob(previous)
+
+def _stat(path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+def _find_blob(inode: int) -> Optional[str]:
+    """Retrouve le blob d'un inode (scandir fournit l'inode sans appel à stat)"""
+    if not os.path.isdir(BLOB_ROOT):
+        return None
+    with os.scandir(BLOB_ROOT) as entries:
+        for entry in entries:
+            if entry.inode() == inode:
+                return entry.path
+    return None
+
+def _release_blob(st: os.stat_result):
+    """Libère le blob si le nom qui vient d'être retiré était sa dernière référence"""
+    # 2 liens avant suppression : le nom du site et l'entrée du store
+    if st.st_nlink != 2:
+        return
+    blob_path = _find_blob(st.st_ino)
+    if blob_path:
+        blob_st = _stat(blob_path)
+        if blob_st and blob_st.st_nlink == 1:
+            os.remove(blob_path)
+
+def _remember_digest(st: os.stat_result, digest: str):
+    with _digest_lock:
+        _digest_cache[(st.st_dev, st.st_ino)] = (st.st_size, st.st_mtime_ns, digest)
+
+def file_digest(path: str, st: Optional[os.stat_result] = None) -> Optional[str]:
+    """
+    Empreinte SHA-256 d'un fichier, mise en cache tant que l'inode, la taille et le mtime
+    ne changent pas. Pour un fichier du store, l'empreinte est le nom du blob (pas de relecture).
+    Opération potentiellement bloquante : à exécuter hors de la boucle asyncio.
+    """
+    st = st or _stat(path)
+    if st is None:
+        return None
+
+    with _digest_lock:
+        cached = _digest_cache.get((st.st_dev, st.st_ino))
+    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+        return cached[2]
+
+    digest = blob_digest(path)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                sha.update(chunk)
+        digest = sha.hexdigest()
+
+    _remember_digest(st, digest)
+    return digest
+
+def blob_digest(path: str) -> Optional[str]:
+    """Empreinte SHA-256 d'un fichier du store, sans le relire (None si hors store)"""
+    st = _stat(path)
+    if not st or st.st_nlink < 2:
+        return None
+    blob_path = _find_blob(st.st_ino)
+    return os.path.basename(blob_path) if blob_path else None
+
+def store_file(
+    source: BinaryIO,
+    site_name: str,
+    filename: str,
+    replace: bool = False,
+    max_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Enregistre un flux comme média d'un site. Le fichier n'est visible sous son nom
+    qu'une fois complet (écriture dans .tmp puis publication atomique).
+    Opération bloquante : à exécuter hors de la boucle asyncio.
+    """
     site_dir = os.path.join(MEDIA_ROOT, site_name)
     os.makedirs(site_dir, exist_ok=True)
-    
-    file_path = os.path.join(site_dir, file.filename)
-    
+
+    # Pas de chemin dans le nom : on reste dans le dossier du site
+    file_path = os.path.join(site_dir, os.path.basename(filename))
+
     if os.path.exists(file_path) and not replace:
         raise FileExistsError("File already exists")
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    return file_path
+
+    tmp_path, digest, size = _write_temp(source, max_size)
+    blob_path = _store_blob(tmp_path, digest)
+    _publish(blob_path, file_path, replace)
+
+    return {"file_path": file_path, "size": size, "sha256": digest}
+
+def import_file(path: str, site_name: str, filename: str, replace: bool = False) -> Dict[str, Any]:
+    """
+    Publie un fichier déjà présent sur le volume média (ex. upload par morceaux terminé).
+    Le fichier est haché puis déplacé dans le store sans être recopié.
+    """
+    site_dir = os.path.join(MEDIA_ROOT, site_name)
+    os.makedirs(site_dir, exist_ok=True)
+    file_path = os.path.join(site_dir, os.path.basename(filename))
+
+    if os.path.exists(file_path) and not replace:
+        raise FileExistsError("File already exists")
+
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            digest.update(chunk)
+
+    blob_path = _store_blob(path, digest.hexdigest())
+    _publish(blob_path, file_path, replace)
+
+    return {"file_path": file_path, "size": size, "sha256": digest.hexdigest()}
+
+def save_file(file: UploadFile, site_name: str, replace: bool = False, max_size: Optional[int] = None) -> Dict[str, Any]:
+    """Sauvegarder un fichier média uploadé"""
+    return store_file(file.file, site_name, file.filename, replace, max_size)
 
 def list_files(site_name: str) -> List[str]:
     """Lister les fichiers d'un site"""
     site_dir = os.path.join(MEDIA_ROOT, site_name)
     if not os.path.exists(site_dir):
         return []
-    
+
     files = []
     for filename in os.listdir(site_dir):
         file_path = os.path.join(site_dir, filename)
-        if os.path.isfile(file_path):
+        # playlist.txt n'est pas un média (généré par generate_playlist)
+        if filename != "playlist.txt" and os.path.isfile(file_path):
             files.append(filename)
-    
+
     return files
 
 def delete_file(site_name: str, filename: str):
     """Supprimer un fichier"""
     file_path = os.path.join(MEDIA_ROOT, site_name, filename)
-    if os.path.exists(file_path):
-        os.remove(file_path)
\ No newline at end of file
+    st = _stat(file_path)
+    if st:
+        os.remove(file_path)
+        _release_blob(st)
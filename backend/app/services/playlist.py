@@ -1,24 +1,102 @@
 #app/services/playlist.py
 import os
-from typing import List
+import time
+import uuid
+import threading
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.notifier import notifier
 
-MEDIA_ROOT = "/app/media"
+MEDIA_ROOT = settings.media_root
+VALID_EXTENSIONS = ('.mp4', '.mov', '.jpg', '.jpeg', '.png')
 
-def generate_playlist(site_name: str) -> str:
-    site_path = os.path.join(MEDIA_ROOT, site_name)
+# Version d'un playlist.txt : (inode, taille, mtime_ns), None si absent
+PlaylistVersion = Optional[Tuple[int, int, int]]
+
+# Cache des playlists parsées : dossier -> (fichiers, version, instant de la dernière vérification)
+_cache: Dict[str, Tuple[Tuple[str, ...], PlaylistVersion, float]] = {}
+_lock = threading.Lock()
+
+def _playlist_dir(site_name: str, location: Optional[str] = None) -> str:
+    if location is None:
+        return os.path.join(MEDIA_ROOT, site_name)
+    return os.path.join(MEDIA_ROOT, site_name, location)
+
+def _stat_version(playlist_path: str) -> PlaylistVersion:
+    try:
+        st = os.stat(playlist_path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+def get_playlist(
+    site_name: str, location: Optional[str] = None, revalidate: bool = False
+) -> Tuple[Tuple[str, ...], PlaylistVersion]:
+    """
+    Playlist d'un site (ou d'une location) et sa version.
+    Servie depuis le cache sans accès disque ; le fichier n'est revérifié (stat) qu'au plus
+    toutes les playlist_revalidate_seconds, pour prendre en compte les modifications externes.
+    """
+    directory = _playlist_dir(site_name, location)
+    now = time.monotonic()
+    with _lock:
+        cached = _cache.get(directory)
+    if cached and not revalidate and now - cached[2] < settings.playlist_revalidate_seconds:
+        return cached[0], cached[1]
+
+    playlist_path = os.path.join(directory, "playlist.txt")
+    version = _stat_version(playlist_path)
+    if cached and cached[1] == version:
+        files = cached[0]
+    elif version is None:
+        files = ()
+    else:
+        try:
+            with open(playlist_path, "r") as f:
+                files = tuple(line.strip() for line in f if line.strip())
+        except FileNotFoundError:
+            files, version = (), None
+
+    with _lock:
+        _cache[directory] = (files, version, now)
+    return files, version
+
+def invalidate_playlist(site_name: str, location: Optional[str] = None):
+    """Oublie la playlist en cache (toutes les locations du site si location est None)"""
+    directory = _playlist_dir(site_name, location)
+    with _lock:
+        if location is None:
+            prefix = directory + os.sep
+            for key in [k for k in _cache if k == directory or k.startswith(prefix)]:
+                del _cache[key]
+        else:
+            _cache.pop(directory, None)
+
+def _write_playlist(site_name: str, location: Optional[str], files: List[str]) -> str:
+    """Écrit playlist.txt atomiquement (fichier temporaire puis renommage) et met à jour le cache"""
+    directory = _playlist_dir(site_name, location)
+    playlist_path = os.path.join(directory, "playlist.txt")
+    tmp_path = os.path.join(directory, f".playlist.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "w") as f:
+        for file in files:
+            f.write(f"{file}\n")
+    os.replace(tmp_path, playlist_path)
+
+    with _lock:
+        _cache[directory] = (tuple(files), _stat_version(playlist_path), time.monotonic())
+
+    notifier.notify(site_name, location)
+    return playlist_path
+
+def generate_playlist(site_name: str, location: Optional[str] = None) -> str:
+    site_path = _playlist_dir(site_name, location)
     if not os.path.exists(site_path):
         raise FileNotFoundError(f"Le dossier du site {site_name} n'existe pas.")
 
     # Liste les fichiers valides
-    valid_extensions = ('.mp4', '.mov', '.jpg', '.jpeg', '.png')
     media_files = sorted([
         f for f in os.listdir(site_path)
-        if f.lower().endswith(valid_extensions)
+        if f.lower().endswith(VALID_EXTENSIONS)
     ])
 
-    playlist_path = os.path.join(site_path, "playlist.txt")
-    with open(playlist_path, "w") as f:
-        for file in media_files:
-            f.write(f"{file}\n")
-
-    return playlist_path
+    return _write_playlist(site_name, location, media_files)
@@ -1,8 +1,26 @@
 # app/services/site.py
 from sqlalchemy.orm import Session
+from app.core.cache import TTLCache, MISSING
+from app.core.config import settings
+from app.core.database import engine
+from app.core.pagination import PageRequest
 from app.models.site import Site
-from app.schemas.site import SiteCreate, SiteUpdate
-from typing import List, Optional
+from app.schemas.site import SiteCreate, SiteUpdate, SiteRead
+from typing import Any, List, Optional
+
+# Cache des sites (par nom et liste complète), invalidé à chaque modification
+site_cache = TTLCache("sites", settings.entity_cache_max_entries, settings.entity_cache_ttl_seconds)
+# Sites lus sur la réplique (get_read_db) : cache séparé, une liste en retard de réplication
+# ne doit jamais être servie aux lectures faites sur la base principale
+replica_site_cache = TTLCache("sites_replica", settings.entity_cache_max_entries, settings.entity_cache_ttl_seconds)
+ALL_SITES_KEY = ("all",)
+
+def invalidate_site_cache():
+    site_cache.clear()
+    replica_site_cache.clear()
+
+def _snapshot_cache(db: Session) -> TTLCache:
+    return site_cache if db.get_bind() is engine else replica_site_cache
 
 def create_site(db: Session, site: SiteCreate) -> Site:
     """Créer un nouveau site"""
@@ -13,19 +31,47 @@ def create_site(db: Session, site: SiteCreate) -> Site:
     db.add(db_site)
     db.commit()
     db.refresh(db_site)
+    invalidate_site_cache()
     return db_site
 
 def get_site_by_id(db: Session, site_id: int) -> Optional[Site]:
     """Récupérer un site par son ID"""
     return db.query(Site).filter(Site.id == site_id).first()
 
-def get_site_by_name(db: Session, name: str) -> Optional[Site]:
-    """Récupérer un site par son nom"""
-    return db.query(Site).filter(Site.name == name).first()
+def get_site_by_name(db: Session, name: str) -> Optional[SiteRead]:
+    """Récupérer un site par son nom (via le cache)"""
+    cache = _snapshot_cache(db)
+    key = ("name", name)
+    cached = cache.get(key)
+    if cached is not MISSING:
+        return cached
+    
+    generation = cache.generation
+    site = db.query(Site).filter(Site.name == name).first()
+    if not site:
+        return None
+    snapshot = SiteRead.model_validate(site)
+    cache.set(key, snapshot, generation=generation)
+    return snapshot
+
+def get_all_sites(db: Session) -> List[SiteRead]:
+    """Récupérer tous les sites (via le cache)"""
+    cache = _snapshot_cache(db)
+    cached = cache.get(ALL_SITES_KEY)
+    if cached is not MISSING:
+        return cached
+    
+    generation = cache.generation
+    sites = [SiteRead.model_validate(site) for site in db.query(Site).all()]
+    cache.set(ALL_SITES_KEY, sites, generation=generation)
+    return sites
 
-def get_all_sites(db: Session) -> List[Site]:
-    """Récupérer tous les sites"""
-    return db.query(Site).all()
+def list_sites_page(db: Session, page: PageRequest, name_prefix: Optional[str] = None) -> List[Any]:
+    """Page de sites filtrée côté base"""
+    query = db.query(*page.columns(Site))
+    if name_prefix:
+        query = query.filter(Site.name.startswith(name_prefix, autoescape=True))
+    return page.apply(query, Site).all()
 
 def update_site(db: Session, site_id: int, site_update: SiteUpdate) -> Optional[Site]:
     """Mettre à jour un site"""
@@ -39,6 +85,7 @@ def update_site(db: Session, site_id: int, site_update: SiteUpdate) -> Optional[
     
     db.commit()
     db.refresh(site)
+    invalidate_site_cache()
     return site
 
 def delete_site(db: Session, site_id: int) -> bool:
@@ -49,4 +96,5 @@ def delete_site(db: Session, site_id: int) -> bool:
     
     db.delete(site)
     db.commit()
+    invalidate_site_cache()
     return True
\ No newline at end of file
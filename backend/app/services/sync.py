@@ -0,0 +1,82 @@
+# app/services/sync.py
+import os
+import json
+import hashlib
+from datetime import datetime, timezone
+from typing import List, Dict, Any
+from app.core.config import settings
+from app.schemas.device import DeviceSnapshot
+from app.services.media import file_digest
+from app.services.playlist import get_playlist
+
+MEDIA_ROOT = settings.media_root
+
+def read_playlist(site: str, location: str) -> List[str]:
+    """Lire la playlist d'un device (depuis le cache des playlists)"""
+    files, _ = get_playlist(site, location)
+    return list(files)
+
+def compute_sync_etag(device: DeviceSnapshot, site: str, location: str) -> str:
+    """
+    Calcule la version de la configuration d'un device.
+    Dépend de la ligne device, des actions en attente et de la version du playlist.txt
+    (inode, taille, mtime) fournie par le cache des playlists, sans accès disque.
+    """
+    _, playlist_version = get_playlist(site, location)
+
+    state = [
+        device.id,
+        device.name,
+        device.enabled,
+        device.volume,
+        device.screen_on,
+        device.schedule,
+        device.pending_actions,
+        playlist_version,
+    ]
+    digest = hashlib.sha1(
+        json.dumps(state, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return f'"{digest}"'
+
+def build_sync_payload(device: DeviceSnapshot, site: str, location: str) -> Dict[str, Any]:
+    """Construit la configuration renvoyée au Raspberry Pi"""
+    if not device.enabled:
+        return {
+            "device": device.name,
+            "enabled": False,
+            "message": "Device désactivé"
+        }
+
+    # Retourne la configuration et les actions en attente
+    return {
+        "device": device.name,
+        "enabled": device.enabled,
+        "playlist": read_playlist(site, location),
+        "volume": device.volume,
+        "screen_on": device.screen_on,
+        "schedule": device.schedule,
+        "pending_actions": device.pending_actions or {}
+    }
+
+def build_manifest(site: str, location: str) -> List[Dict[str, Any]]:
+    """
+    Liste taille, date de modification et SHA-256 de chaque fichier de la playlist,
+    pour que le device ne télécharge que ce qui a changé.
+    Les fichiers absents du disque sont ignorés.
+    """
+    media_path = os.path.join(MEDIA_ROOT, site, location)
+    entries = []
+    for filename in read_playlist(site, location):
+        file_path = os.path.join(media_path, filename)
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            continue
+        entries.append({
+            "filename": filename,
+            "size": st.st_size,
+            "mtime": datetime.fromtimestamp(st.st_mtime, tz=timezone.utc).isoformat(),
+            "sha256": file_digest(file_path, st),
+        })
+    return entries
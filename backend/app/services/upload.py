@@ -0,0 +1,170 @@
+# app/services/upload.py
+import os
+import re
+import json
+import time
+import uuid
+import asyncio
+from typing import AsyncIterator, Dict, Any, Optional
+from fastapi.concurrency import run_in_threadpool
+from app.services import media
+
+# Sessions d'upload par morceaux : <id>.part (données reçues) et <id>.json (métadonnées).
+# Le dossier est sur le volume média pour que la finalisation soit un simple déplacement.
+UPLOAD_ROOT = os.path.join(media.MEDIA_ROOT, ".uploads")
+WRITE_BUFFER_SIZE = 1024 * 1024
+SESSION_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+class UploadSessionNotFound(Exception):
+    """Session d'upload inconnue ou expirée"""
+
+class UploadOffsetMismatch(Exception):
+    """L'offset du morceau ne correspond pas aux données déjà reçues"""
+
+    def __init__(self, offset: int):
+        super().__init__(f"Expected offset {offset}")
+        self.offset = offset
+
+class UploadIncomplete(Exception):
+    """Toutes les données annoncées n'ont pas été reçues"""
+
+# Un seul morceau écrit à la fois par session (dans ce worker)
+_session_locks: Dict[str, asyncio.Lock] = {}
+
+def _paths(upload_id: str):
+    if not SESSION_ID_PATTERN.match(upload_id):
+        raise UploadSessionNotFound(upload_id)
+    base = os.path.join(UPLOAD_ROOT, upload_id)
+    return base + ".part", base + ".json"
+
+def _read_session(upload_id: str) -> Dict[str, Any]:
+    part_path, meta_path = _paths(upload_id)
+    try:
+        with open(meta_path, "r") as f:
+            session = json.load(f)
+        session["offset"] = os.path.getsize(part_path)
+    except FileNotFoundError:
+        raise UploadSessionNotFound(upload_id)
+    return session
+
+def create_session(site_name: str, filename: str, size: Optional[int] = None, replace: bool = False) -> Dict[str, Any]:
+    """Créer une session d'upload"""
+    os.makedirs(UPLOAD_ROOT, exist_ok=True)
+    upload_id = uuid.uuid4().hex
+    part_path, meta_path = _paths(upload_id)
+
+    session = {
+        "id": upload_id,
+        "site_name": site_name,
+        "filename": os.path.basename(filename),
+        "size": size,
+        "replace": replace,
+        "created_at": time.time(),
+    }
+    open(part_path, "wb").close()
+    with open(meta_path, "w") as f:
+        json.dump(session, f)
+
+    session["offset"] = 0
+    return session
+
+def get_session(upload_id: str) -> Dict[str, Any]:
+    """Récupérer une session et l'offset courant"""
+    return _read_session(upload_id)
+
+async def append_chunk(
+    upload_id: str,
+    offset: int,
+    chunks: AsyncIterator[bytes],
+    max_size: Optional[int] = None
+) -> int:
+    """
+    Ajoute un morceau à la session à partir de l'offset indiqué et retourne le nouvel offset.
+    Les données sont écrites au fil de l'eau, sans bufferiser le fichier en mémoire.
+    """
+    lock = _session_locks.setdefault(upload_id, asyncio.Lock())
+    async with lock:
+        session = await run_in_threadpool(_read_session, upload_id)
+        if offset != session["offset"]:
+            raise UploadOffsetMismatch(session["offset"])
+
+        limit = session["size"] if session["size"] is not None else max_size
+        part_path, _ = _paths(upload_id)
+        f = await run_in_threadpool(open, part_path, "ab")
+        try:
+            written = session["offset"]
+            pending = bytearray()
+            async for chunk in chunks:
+                written += len(chunk)
+                if limit is not None and written > limit:
+                    raise media.FileTooLargeError(f"Upload exceeds {limit} bytes")
+                pending += chunk
+                if len(pending) >= WRITE_BUFFER_SIZE:
+                    await run_in_threadpool(f.write, bytes(pending))
+                    pending.clear()
+            if pending:
+                await run_in_threadpool(f.write, bytes(pending))
+        finally:
+            await run_in_threadpool(f.close)
+
+        # En cas d'erreur, les données déjà écrites restent : le client reprend à l'offset courant
+        return os.path.getsize(part_path)
+
+def _complete_locked(upload_id: str) -> Dict[str, Any]:
+    # Taille relue sur le disque sous le verrou : aucun morceau ne peut plus être en cours d'écriture
+    session = _read_session(upload_id)
+    if session["size"] is not None and session["offset"] != session["size"]:
+        raise UploadIncomplete(f"{session['offset']}/{session['size']} bytes received")
+
+    part_path, meta_path = _paths(upload_id)
+    stored = media.import_file(part_path, session["site_name"], session["filename"], session["replace"])
+    os.remove(meta_path)
+    return stored
+
+async def complete_session(upload_id: str) -> Dict[str, Any]:
+    """
+    Finalise l'upload : le fichier est haché, dédupliqué et publié atomiquement.
+    Le verrou de la session est pris pour qu'un morceau concurrent ne modifie pas
+    le fichier après son hachage (le blob ne correspondrait plus à son empreinte).
+    """
+    lock = _session_locks.setdefault(upload_id, asyncio.Lock())
+    async with lock:
+        stored = await run_in_threadpool(_complete_locked, upload_id)
+    _session_locks.pop(upload_id, None)
+    return stored
+
+def delete_session(upload_id: str):
+    """Abandonne une session"""
+    for path in _paths(upload_id):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    _session_locks.pop(upload_id, None)
+
+def cleanup_sessions(max_age_seconds: int) -> int:
+    """Supprime les sessions sans activité depuis max_age_seconds"""
+    if not os.path.isdir(UPLOAD_ROOT):
+        return 0
+
+    # Dernière activité par session : le plus récent des deux fichiers (.part ou .json)
+    last_activity: Dict[str, float] = {}
+    with os.scandir(UPLOAD_ROOT) as entries:
+        for entry in entries:
+            upload_id, _ = os.path.splitext(entry.name)
+            try:
+                mtime = entry.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            last_activity[upload_id] = max(last_activity.get(upload_id, 0), mtime)
+
+    now = time.time()
+    removed = 0
+    for upload_id, mtime in last_activity.items():
+        lock = _session_locks.get(upload_id)
+        if now - mtime <= max_age_seconds or (lock and lock.locked()):
+            continue
+        if SESSION_ID_PATTERN.match(upload_id):
+            delete_session(upload_id)
+            removed += 1
+    return removed
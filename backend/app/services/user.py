@@ -1,13 +1,20 @@
 # app/services/user.py
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.pagination import PageRequest
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.services.auth import get_password_hash
-from typing import List, Optional
+from app.services.auth import get_password_hash, invalidate_user_tokens
+from typing import Any, List, Optional
 
-def create_user(db: Session, user: UserCreate) -> User:
-    """Créer un nouvel utilisateur"""
-    hashed_password = get_password_hash(user.password)
+def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None) -> User:
+    """
+    Créer un nouvel utilisateur. Les endpoints passent le hash déjà calculé par le pool
+    dédié (get_password_hash_async) ; sinon il est calculé ici (usage hors ligne).
+    """
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     
     db_user = User(
         email=user.email,
@@ -25,6 +32,11 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     """Récupérer un utilisateur par son email"""
     return db.query(User).filter(User.email == email).first()
 
+async def get_user_by_email_async(db: AsyncSession, email: str) -> Optional[User]:
+    """Récupérer un utilisateur par son email (session asynchrone)"""
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
 def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
     """Récupérer un utilisateur par son ID"""
     return db.query(User).filter(User.id == user_id).first()
@@ -33,8 +45,30 @@ def get_all_users(db: Session) -> List[User]:
     """Récupérer tous les utilisateurs"""
     return db.query(User).all()
 
-def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[User]:
-    """Mettre à jour un utilisateur"""
+def list_users_page(
+    db: Session,
+    page: PageRequest,
+    site_id: Optional[int] = None,
+    role: Optional[str] = None,
+    email_prefix: Optional[str] = None
+) -> List[Any]:
+    """Page d'utilisateurs filtrée côté base"""
+    query = db.query(*page.columns(User))
+    if site_id:
+        query = query.filter(User.site_id == site_id)
+    if role:
+        query = query.filter(User.role == role)
+    if email_prefix:
+        query = query.filter(User.email.startswith(email_prefix, autoescape=True))
+    return page.apply(query, User).all()
+
+def update_user(
+    db: Session,
+    user_id: int,
+    user_update: UserUpdate,
+    hashed_password: Optional[str] = None
+) -> Optional[User]:
+    """Mettre à jour un utilisateur (hashed_password : hash du nouveau mot de passe, déjà calculé)"""
     user = get_user_by_id(db, user_id)
     if not user:
         return None
@@ -43,7 +77,7 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[
     
     # Si un nouveau mot de passe est fourni, le hasher
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data["password"])
+        update_data["hashed_password"] = hashed_password or get_password_hash(update_data["password"])
         del update_data["password"]
     
     for field, value in update_data.items():
@@ -51,6 +85,7 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[
     
     db.commit()
     db.refresh(user)
+    invalidate_user_tokens(user_id)
     return user
 
 def delete_user(db: Session, user_id: int) -> bool:
@@ -61,4 +96,5 @@ def delete_user(db: Session, user_id: int) -> bool:
     
     db.delete(user)
     db.commit()
+    invalidate_user_tokens(user_id)
     return True
\ No newline at end of file
@@ -0,0 +1,101 @@
+# benchmarks/serialization.py
+"""
+Compare la sérialisation par défaut de FastAPI (validation du response_model puis
+json de la bibliothèque standard) au mode rapide (lecture directe des objets ORM + FastJSONResponse).
+
+Usage : python benchmarks/serialization.py [--devices 10000] [--repeat 5]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse, dump_trusted_list, orjson
+from app.models.device import Device
+from app.schemas.device import DeviceRead
+
+def make_devices(count: int) -> List[Device]:
+    """Objets ORM représentatifs (system_info et schedule renseignés)"""
+    now = datetime.utcnow()
+    return [
+        Device(
+            id=i, site_id=i % 50 + 1, location=f"loc{i}", name=f"site{i % 50}-loc{i}",
+            last_seen=now, is_online=i % 3 != 0, is_playing=i % 2 == 0, current_media="video.mp4",
+            ip_address="10.0.0.1", mac_address="b8:27:eb:00:00:00",
+            system_info={"cpu": 12.5, "ram": 48.1, "disk": 71.0, "temp": 52.3, "uptime": 123456},
+            enabled=True, volume=50, screen_on=True,
+            schedule={"on": "08:00", "off": "20:00", "days": [1, 2, 3, 4, 5]},
+            pending_actions={},
+        )
+        for i in range(count)
+    ]
+
+def measure(func, repeat: int) -> float:
+    """Médiane en millisecondes"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    devices = make_devices(args.devices)
+    adapter = TypeAdapter(List[DeviceRead])
+
+    def default_list():
+        # Chemin de FastAPI avec response_model=List[DeviceRead]
+        validated = adapter.validate_python(devices, from_attributes=True)
+        return JSONResponse(adapter.dump_python(validated, mode="json")).body
+
+    def fast_list():
+        return FastJSONResponse(dump_trusted_list(devices, DeviceRead)).body
+
+    payload = {
+        "device": "paris-hall", "enabled": True,
+        "playlist": [f"media_{i:03d}.mp4" for i in range(50)],
+        "volume": 50, "screen_on": True,
+        "schedule": {"on": "08:00", "off": "20:00"}, "pending_actions": {"reboot": True},
+    }
+
+    def default_sync():
+        return JSONResponse(payload).body
+
+    def fast_sync():
+        return FastJSONResponse(payload).body
+
+    # Les deux modes doivent produire le même document
+    assert json.loads(default_list()) == json.loads(fast_list())
+    assert json.loads(default_sync()) == json.loads(fast_sync())
+
+    # Pour le sync, 1000 appels par mesure : la durée en ms équivaut à des µs par appel
+    results = {
+        "encoder": "orjson" if orjson is not None else "json",
+        "devices": args.devices,
+        "list_devices_default_ms": round(measure(default_list, args.repeat), 2),
+        "list_devices_fast_ms": round(measure(fast_list, args.repeat), 2),
+        "sync_default_us": round(measure(lambda: [default_sync() for _ in range(1000)], args.repeat), 2),
+        "sync_fast_us": round(measure(lambda: [fast_sync() for _ in range(1000)], args.repeat), 2),
+    }
+    results["list_speedup"] = round(results["list_devices_default_ms"] / results["list_devices_fast_ms"], 1)
+    results["sync_speedup"] = round(results["sync_default_us"] / results["sync_fast_us"], 1)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()